@@ -0,0 +1,270 @@
+"""
+Streaming password audit reports
+
+AuditAggregator folds scoring results into a fixed set of counters
+(strength distribution, failed criteria, length histogram, blocklist and
+breach hits, most common feedback) and never keeps per-password results,
+so memory stays constant however many passwords are audited. Aggregates
+are plain counters, so partial results from sharded workers merge exactly.
+
+    python audit_report.py audit passwords.txt --workers 4 --json report.json
+    python audit_report.py audit shard-1.txt --partial shard-1.json
+    python audit_report.py merge shard-*.json --csv report.csv --parquet report.parquet
+"""
+import argparse
+import csv
+import json
+import sys
+from collections import Counter
+from itertools import islice
+from multiprocessing import Pool
+
+import password_core
+from breach_check import get_breach_checker
+from password_policy import load_policy
+
+REPORT_FORMAT = 2
+# Lengths at or above this share the last histogram bucket
+MAX_LENGTH_BUCKET = 64
+TOP_WEAKNESSES = 10
+CHUNK_SIZE = 10_000
+
+
+class AuditAggregator:
+    """Mergeable counters over scoring results for one policy"""
+
+    def __init__(self, policy_key, policy_cache_key):
+        self.policy_key = policy_key  # name@version, for display
+        # Identifies the exact rule set, so shards scored under different
+        # rules that share a name and version are never merged
+        self.policy_cache_key = policy_cache_key
+        self.total = 0
+        self.strengths = Counter()
+        self.failed_criteria = Counter()
+        self.lengths = Counter()
+        self.feedback = Counter()
+        self.blocklisted = 0
+        self.breached = 0
+        self.breach_unknown = 0
+
+    def add(self, password, result):
+        """Counts one password and its check_password_strength result"""
+        self.total += 1
+        self.strengths[result["strength"]] += 1
+        self.lengths[min(len(password), MAX_LENGTH_BUCKET)] += 1
+        for key, met in result.get("criteria", {}).items():
+            if not met:
+                self.failed_criteria[key] += 1
+        self.feedback.update(result["feedback"])
+        if result.get("blocklisted"):
+            self.blocklisted += 1
+        if "breach_count" in result:
+            if result["breach_count"] is None:
+                self.breach_unknown += 1
+            elif result["breach_count"]:
+                self.breached += 1
+
+    def add_passwords(self, passwords, policy=None, breach_checker=None):
+        """Scores and counts an iterable of passwords without keeping the results"""
+        policy = policy or load_policy()
+        for password in passwords:
+            self.add(password, password_core.check_password_strength(password, policy, breach_checker))
+        return self
+
+    def merge(self, other):
+        """Adds another aggregator's counts (e.g. from another shard) into this one"""
+        if other.policy_cache_key != self.policy_cache_key:
+            raise ValueError(f"Cannot merge audits of {other.policy_cache_key} into {self.policy_cache_key}")
+        self.total += other.total
+        self.strengths.update(other.strengths)
+        self.failed_criteria.update(other.failed_criteria)
+        self.lengths.update(other.lengths)
+        self.feedback.update(other.feedback)
+        self.blocklisted += other.blocklisted
+        self.breached += other.breached
+        self.breach_unknown += other.breach_unknown
+        return self
+
+    def to_dict(self):
+        """Serializable partial result; from_dict restores it exactly"""
+        return {
+            "format": REPORT_FORMAT,
+            "policy": self.policy_key,
+            "policy_cache_key": self.policy_cache_key,
+            "total": self.total,
+            "strengths": dict(self.strengths),
+            "failed_criteria": dict(self.failed_criteria),
+            "lengths": {str(length): count for length, count in sorted(self.lengths.items())},
+            "feedback": dict(self.feedback),
+            "blocklisted": self.blocklisted,
+            "breached": self.breached,
+            "breach_unknown": self.breach_unknown,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("format") != REPORT_FORMAT:
+            raise ValueError(f"Unsupported audit format {data.get('format')!r}")
+        aggregator = cls(data["policy"], data["policy_cache_key"])
+        aggregator.total = data["total"]
+        aggregator.strengths.update(data["strengths"])
+        aggregator.failed_criteria.update(data["failed_criteria"])
+        aggregator.lengths.update({int(length): count for length, count in data["lengths"].items()})
+        aggregator.feedback.update(data["feedback"])
+        aggregator.blocklisted = data["blocklisted"]
+        aggregator.breached = data["breached"]
+        aggregator.breach_unknown = data["breach_unknown"]
+        return aggregator
+
+    def report(self):
+        """The summary auditors read: counts plus rates and the top weaknesses"""
+        def rate(count):
+            return count / self.total if self.total else 0.0
+
+        return {
+            "policy": self.policy_key,
+            "total": self.total,
+            "strengths": {name: {"count": count, "rate": rate(count)}
+                          for name, count in self.strengths.most_common()},
+            "failed_criteria": {key: {"count": count, "rate": rate(count)}
+                                for key, count in self.failed_criteria.most_common()},
+            "lengths": {(f"{length}+" if length == MAX_LENGTH_BUCKET else str(length)): count
+                        for length, count in sorted(self.lengths.items())},
+            "blocklist_hit_rate": rate(self.blocklisted),
+            "breach_hit_rate": rate(self.breached),
+            "breach_unknown": self.breach_unknown,
+            "top_weaknesses": [{"feedback": message, "count": count}
+                               for message, count in self.feedback.most_common(TOP_WEAKNESSES)],
+        }
+
+    def rows(self):
+        """The report flattened to (section, key, count, rate) rows for CSV/Parquet"""
+        report = self.report()
+        yield ("total", "", self.total, 1.0)
+        for section in ("strengths", "failed_criteria"):
+            for key, values in report[section].items():
+                yield (section, key, values["count"], values["rate"])
+        for key, count in report["lengths"].items():
+            yield ("lengths", key, count, count / self.total if self.total else 0.0)
+        yield ("blocklist", "hits", self.blocklisted, report["blocklist_hit_rate"])
+        yield ("breach", "hits", self.breached, report["breach_hit_rate"])
+        yield ("breach", "unknown", self.breach_unknown, None)
+        for weakness in report["top_weaknesses"]:
+            count = weakness["count"]
+            yield ("top_weaknesses", weakness["feedback"], count, count / self.total if self.total else 0.0)
+
+
+ROW_COLUMNS = ("section", "key", "count", "rate")
+
+
+def write_json(aggregator, path):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(aggregator.report(), file, indent=2)
+
+
+def write_csv(aggregator, path):
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(ROW_COLUMNS)
+        writer.writerows(aggregator.rows())
+
+
+def write_parquet(aggregator, path):
+    """Writes the report rows as a Parquet table (needs pyarrow)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as error:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)") from error
+    columns = list(zip(*aggregator.rows()))
+    table = pa.table({name: list(values) for name, values in zip(ROW_COLUMNS, columns)})
+    pq.write_table(table, path)
+
+
+def read_chunks(path, size=CHUNK_SIZE):
+    """Yields lists of at most `size` passwords from a one-per-line file"""
+    with open(path, "r", encoding="utf-8", errors="surrogateescape") as file:
+        lines = (line.rstrip("\r\n") for line in file)
+        passwords = (line for line in lines if line)
+        while True:
+            chunk = list(islice(passwords, size))
+            if not chunk:
+                return
+            yield chunk
+
+
+def _audit_chunk(args):
+    """Worker: scores one chunk and returns its partial result as a dict"""
+    policy_file, passwords = args
+    policy = load_policy(policy_file)
+    return AuditAggregator(policy.key, policy.cache_key).add_passwords(passwords, policy, get_breach_checker()).to_dict()
+
+
+def audit_file(path, policy_file=None, workers=1):
+    """
+    Audits a password file, scoring chunks in `workers` processes; breach
+    hits are counted when $PASSWORD_BREACH_RANGE_URL is set
+    """
+    policy = load_policy(policy_file)
+    aggregator = AuditAggregator(policy.key, policy.cache_key)
+    if workers <= 1:
+        breach_checker = get_breach_checker()
+        for chunk in read_chunks(path):
+            aggregator.add_passwords(chunk, policy, breach_checker)
+        return aggregator
+
+    # imap keeps only a few chunks in flight instead of reading the whole file
+    with Pool(workers) as pool:
+        tasks = ((policy_file, chunk) for chunk in read_chunks(path))
+        for partial in pool.imap_unordered(_audit_chunk, tasks):
+            aggregator.merge(AuditAggregator.from_dict(partial))
+    return aggregator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate password audit reports")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    audit = commands.add_parser("audit", help="score a file of passwords, one per line")
+    audit.add_argument("passwords")
+    audit.add_argument("--policy", help="policy file (default: $PASSWORD_POLICY_FILE or the bundled policy)")
+    audit.add_argument("--workers", type=int, default=1)
+
+    merge = commands.add_parser("merge", help="combine partial results from sharded audits")
+    merge.add_argument("partials", nargs="+")
+
+    for command in (audit, merge):
+        command.add_argument("--partial", help="write the mergeable partial result (JSON) here")
+        command.add_argument("--json", help="write the report as JSON")
+        command.add_argument("--csv", help="write the report rows as CSV")
+        command.add_argument("--parquet", help="write the report rows as Parquet (needs pyarrow)")
+    args = parser.parse_args()
+
+    if args.command == "audit":
+        aggregator = audit_file(args.passwords, args.policy, args.workers)
+    else:
+        aggregator = None
+        for path in args.partials:
+            with open(path, "r", encoding="utf-8") as file:
+                partial = AuditAggregator.from_dict(json.load(file))
+            aggregator = partial if aggregator is None else aggregator.merge(partial)
+
+    if args.partial:
+        with open(args.partial, "w", encoding="utf-8") as file:
+            json.dump(aggregator.to_dict(), file)
+    if args.json:
+        write_json(aggregator, args.json)
+    if args.csv:
+        write_csv(aggregator, args.csv)
+    if args.parquet:
+        try:
+            write_parquet(aggregator, args.parquet)
+        except RuntimeError as error:
+            sys.exit(str(error))
+    if not (args.partial or args.json or args.csv or args.parquet):
+        json.dump(aggregator.report(), sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
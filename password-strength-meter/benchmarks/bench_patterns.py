@@ -0,0 +1,70 @@
+"""
+Keyboard-walk and sequence matcher cost by password length
+
+Times patterns.longest_run (the scoring path) and patterns.find_patterns
+(which also builds the matches) on random passwords and on walk-heavy
+ones. The per-character column should stay flat if the cost is linear.
+
+    python benchmarks/bench_patterns.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import build_corpus  # noqa: E402
+from patterns import find_patterns, longest_run  # noqa: E402
+
+WALKS = ("qwerty", "asdfgh", "zxcvbn", "1234", "abcd", "7894", "aoeuid", "azerty", "4321")
+# Typical passwords should take well under this many microseconds
+TYPICAL_BUDGET_US = 50.0
+
+
+def walk_corpus(count, length, seed=0):
+    """Passwords made of concatenated walks and sequences, truncated to `length`"""
+    rng = random.Random(seed)
+    passwords = []
+    for _ in range(count):
+        text = ""
+        while len(text) < length:
+            text += rng.choice(WALKS)
+        passwords.append(text[:length])
+    return passwords
+
+
+def time_per_call(function, passwords, rounds=5):
+    """Best-of-rounds mean time per call, in microseconds"""
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for password in passwords:
+            function(password)
+        best = min(best, time.perf_counter() - started)
+    return best / len(passwords) * 1e6
+
+
+def main():
+    print(f"{'corpus':<10}{'length':>8}{'longest us':>12}{'find us':>10}{'ns/char':>10}")
+    typical = []
+    for corpus in ("random", "walks"):
+        for length in (8, 16, 32, 64, 256, 1024):
+            count = max(200, 20_000 // length)
+            if corpus == "walks":
+                passwords = walk_corpus(count, length)
+            else:
+                passwords = build_corpus("random", count, length)
+            longest_us = time_per_call(longest_run, passwords)
+            find_us = time_per_call(find_patterns, passwords)
+            if length <= 32:
+                typical.append(max(longest_us, find_us))
+            print(f"{corpus:<10}{length:>8}{longest_us:>12.2f}{find_us:>10.2f}{longest_us / length * 1000:>10.1f}")
+
+    worst = max(typical)
+    verdict = "within" if worst < TYPICAL_BUDGET_US else "OVER"
+    print(f"\nSlowest typical (<= 32 chars) call: {worst:.2f} us, {verdict} the {TYPICAL_BUDGET_US:.0f} us budget")
+
+
+if __name__ == "__main__":
+    main()
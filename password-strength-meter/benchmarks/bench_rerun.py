@@ -0,0 +1,63 @@
+"""
+Rerun benchmark for the check tab
+
+Types a password one keystroke at a time through Streamlit's AppTest and
+reports the server-side rerun time and the number of elements (delta
+messages) each keystroke produces. Run it on two revisions to compare:
+
+    python benchmarks/bench_rerun.py --password "Tr0ub4dor&3xyz" --repeat 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from streamlit.testing.v1 import AppTest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_FILE = os.path.join(APP_DIR, "password_strength_app.py")
+
+
+def count_elements(node):
+    """Counts the leaf elements under a node of the AppTest element tree"""
+    children = getattr(node, "children", None)
+    if not children:
+        return 1
+    return sum(count_elements(child) for child in children.values())
+
+
+def run_benchmark(password, repeat):
+    """Returns (per-keystroke rerun times in ms, elements per rerun)"""
+    sys.path.insert(0, APP_DIR)
+    timings = []
+    element_counts = []
+    for _ in range(repeat):
+        app = AppTest.from_file(APP_FILE, default_timeout=30)
+        app.run()
+        for end in range(1, len(password) + 1):
+            app.text_input(key="hidden_password").set_value(password[:end])
+            started = time.perf_counter()
+            app.run()
+            timings.append((time.perf_counter() - started) * 1000)
+            element_counts.append(count_elements(app.main))
+    return timings, element_counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--password", default="Tr0ub4dor&3xyz")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    timings, element_counts = run_benchmark(args.password, args.repeat)
+    timings.sort()
+    print(f"keystrokes:        {len(timings)}")
+    print(f"rerun mean (ms):   {statistics.mean(timings):.2f}")
+    print(f"rerun p50 (ms):    {statistics.median(timings):.2f}")
+    print(f"rerun p95 (ms):    {timings[int(len(timings) * 0.95) - 1]:.2f}")
+    print(f"elements / rerun:  {statistics.mean(element_counts):.1f}")
+
+
+if __name__ == "__main__":
+    main()
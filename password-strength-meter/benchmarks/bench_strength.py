@@ -0,0 +1,235 @@
+"""
+Strength-estimation benchmark and regression harness
+
+Measures throughput and latency percentiles of check_password_strength and
+generate_strong_passwords at several input lengths and batch sizes, and
+records a score-distribution snapshot for each synthetic corpus so that
+accuracy regressions are caught alongside speed regressions.
+
+    python benchmarks/bench_strength.py                          # print a report
+    python benchmarks/bench_strength.py --save benchmarks/baseline.json
+    python benchmarks/bench_strength.py --compare benchmarks/baseline.json
+
+Baselines are machine specific and kept out of version control. --compare
+exits with status 1 when a metric regresses beyond its tolerance or a
+score distribution differs from the baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from collections import Counter
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+import password_core  # noqa: E402
+from corpus import CORPORA, build_corpus  # noqa: E402
+from password_policy import load_policy  # noqa: E402
+
+CHECK_LENGTHS = (8, 16, 32, 64, 256)
+CHECK_BATCH_SIZES = (1, 100, 10_000)
+GENERATE_LENGTHS = (8, 16, 32)
+GENERATE_BATCH_SIZES = (1, 100, 10_000)
+DISTRIBUTION_LENGTHS = (6, 12, 20)
+
+
+def percentiles(samples_ns):
+    """p50/p95/p99 of per-call latencies, in microseconds"""
+    ordered = sorted(samples_ns)
+
+    def pick(fraction):
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] / 1000
+
+    return {"p50_us": pick(0.50), "p95_us": pick(0.95), "p99_us": pick(0.99)}
+
+
+def bench_check(policy, calls):
+    """Per-call latency of check_password_strength across corpora and lengths"""
+    metrics = {}
+    for length in CHECK_LENGTHS:
+        passwords = []
+        for name in CORPORA:
+            passwords.extend(build_corpus(name, calls // len(CORPORA), length))
+        samples = []
+        started = time.perf_counter()
+        for password in passwords:
+            call_started = time.perf_counter_ns()
+            password_core.check_password_strength(password, policy)
+            samples.append(time.perf_counter_ns() - call_started)
+        elapsed = time.perf_counter() - started
+        metrics[f"check.len{length}"] = {"per_s": len(passwords) / elapsed, **percentiles(samples)}
+    return metrics
+
+
+def bench_check_batches(policy, total):
+    """Throughput of batched scoring via check_passwords"""
+    metrics = {}
+    passwords = build_corpus("human", total, 12)
+    for batch_size in CHECK_BATCH_SIZES:
+        batches = [passwords[i:i + batch_size] for i in range(0, total, batch_size)]
+        samples = []
+        started = time.perf_counter()
+        for batch in batches:
+            call_started = time.perf_counter_ns()
+            password_core.check_passwords(batch, policy)
+            samples.append(time.perf_counter_ns() - call_started)
+        elapsed = time.perf_counter() - started
+        metrics[f"check_batch.size{batch_size}"] = {"per_s": total / elapsed, **percentiles(samples)}
+    return metrics
+
+
+def bench_generate(policy, total):
+    """Throughput and per-call latency of generate_strong_passwords"""
+    metrics = {}
+    for length in GENERATE_LENGTHS:
+        for batch_size in GENERATE_BATCH_SIZES:
+            calls = max(total // batch_size, 5)
+            samples = []
+            started = time.perf_counter()
+            for _ in range(calls):
+                call_started = time.perf_counter_ns()
+                password_core.generate_strong_passwords(batch_size, length, policy)
+                samples.append(time.perf_counter_ns() - call_started)
+            elapsed = time.perf_counter() - started
+            metrics[f"generate.len{length}.size{batch_size}"] = {
+                "per_s": calls * batch_size / elapsed,
+                **percentiles(samples),
+            }
+    return metrics
+
+
+def score_distributions(policy, count):
+    """
+    Deterministic snapshot of how each corpus scores: counts per strength,
+    per score and per criteria bitmask
+    """
+    snapshot = {}
+    for name in CORPORA:
+        for length in DISTRIBUTION_LENGTHS:
+            strengths = Counter()
+            scores = Counter()
+            masks = Counter()
+            for password in build_corpus(name, count, length):
+                result = password_core.check_password_strength(password, policy)
+                strengths[result["strength"]] += 1
+                scores[str(result["score"])] += 1
+                masks[str(result.get("criteria_mask", 0))] += 1
+            snapshot[f"{name}.len{length}"] = {
+                "strength": dict(sorted(strengths.items())),
+                "score": dict(sorted(scores.items())),
+                "criteria_mask": dict(sorted(masks.items())),
+            }
+    return snapshot
+
+
+def best_of(runs):
+    """Merges repeated runs, keeping the best value of every metric"""
+    merged = {}
+    for metrics in runs:
+        for name, values in metrics.items():
+            best = merged.setdefault(name, dict(values))
+            best["per_s"] = max(best["per_s"], values["per_s"])
+            for key in ("p50_us", "p95_us", "p99_us"):
+                best[key] = min(best[key], values[key])
+    return merged
+
+
+def run(quick=False, repeat=3):
+    """Runs every benchmark `repeat` times and returns the full report"""
+    policy = load_policy()
+    scale = 1 if quick else 10
+    runs = []
+    for _ in range(repeat):
+        metrics = {}
+        metrics.update(bench_check(policy, 2_000 * scale))
+        metrics.update(bench_check_batches(policy, 10_000 * scale))
+        metrics.update(bench_generate(policy, 2_000 * scale))
+        runs.append(metrics)
+    return {
+        "policy": policy.key,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "quick": quick,
+        "metrics": best_of(runs),
+        "distributions": score_distributions(policy, 1_000),
+    }
+
+
+def compare(report, baseline, tolerance, tail_tolerance):
+    """
+    Returns a list of regression messages (empty when nothing regressed)
+    Tail latency is noisier than the median, so p99 gets its own tolerance
+    """
+    problems = []
+    if report["policy"] != baseline["policy"]:
+        problems.append(f"policy changed: {baseline['policy']} -> {report['policy']}")
+
+    for name, old in baseline["metrics"].items():
+        new = report["metrics"].get(name)
+        if new is None:
+            problems.append(f"{name}: missing from this run")
+            continue
+        if new["per_s"] < old["per_s"] * (1 - tolerance):
+            problems.append(f"{name}: throughput {old['per_s']:.0f}/s -> {new['per_s']:.0f}/s")
+        if new["p50_us"] > old["p50_us"] * (1 + tolerance):
+            problems.append(f"{name}: p50 {old['p50_us']:.1f} us -> {new['p50_us']:.1f} us")
+        if new["p99_us"] > old["p99_us"] * (1 + tail_tolerance):
+            problems.append(f"{name}: p99 {old['p99_us']:.1f} us -> {new['p99_us']:.1f} us")
+
+    for name, old in baseline["distributions"].items():
+        new = report["distributions"].get(name)
+        if new != old:
+            problems.append(f"{name}: score distribution changed {old['strength']} -> "
+                            f"{new['strength'] if new else None}")
+    return problems
+
+
+def print_report(report):
+    print(f"policy {report['policy']}, Python {report['python']} on {report['machine']}")
+    print(f"{'metric':<28}{'per second':>14}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}")
+    for name, values in report["metrics"].items():
+        print(f"{name:<28}{values['per_s']:>14.0f}{values['p50_us']:>10.1f}"
+              f"{values['p95_us']:>10.1f}{values['p99_us']:>10.1f}")
+    print()
+    for name, values in report["distributions"].items():
+        print(f"{name:<20} {values['strength']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Password strength benchmarks")
+    parser.add_argument("--quick", action="store_true", help="10x fewer iterations")
+    parser.add_argument("--save", metavar="PATH", help="write the report as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a JSON baseline")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per metric, best one kept")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative slowdown of throughput and p50")
+    parser.add_argument("--tail-tolerance", type=float, default=1.0,
+                        help="allowed relative slowdown of p99 latency")
+    args = parser.parse_args()
+
+    report = run(args.quick, args.repeat)
+    print_report(report)
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"\nBaseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        problems = compare(report, baseline, args.tolerance, args.tail_tolerance)
+        print()
+        if problems:
+            print("Regressions:")
+            for problem in problems:
+                print(f"  - {problem}")
+            sys.exit(1)
+        print(f"No regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Synthetic password corpora for benchmarks
+
+Every corpus is generated locally from a fixed seed, so benchmark runs and
+score-distribution snapshots are reproducible across machines without
+shipping any real leaked-password data.
+"""
+import random
+import string
+
+# Common English words (public domain) used to build human-style passwords
+COMMON_WORDS = (
+    "time year people way day man thing woman life child world school state "
+    "family student group country problem hand part place case week company "
+    "system program question work government number night point home water "
+    "room mother area money story fact month lot right study book eye job word "
+    "business issue side kind head house service friend father power hour game "
+    "line end member law car city community name president team minute idea "
+    "kid body information back parent face others level office door health "
+    "person art war history party result change morning reason research girl "
+    "guy moment air teacher force education dragon sunshine summer winter "
+    "autumn spring coffee garden forest river ocean mountain silver golden"
+).split()
+
+COMMON_PASSWORDS = (
+    "password", "123456", "qwerty", "admin", "welcome", "password123",
+    "abc123", "letmein", "monkey", "1234567890", "iloveyou", "football",
+)
+
+LEET = str.maketrans({"a": "4", "e": "3", "i": "1", "o": "0", "s": "$", "t": "7"})
+SYMBOLS = "!@#$%^&*"
+
+
+def random_corpus(rng, count, length):
+    """Uniform character soup over printable ASCII"""
+    alphabet = string.ascii_letters + string.digits + string.punctuation
+    return ["".join(rng.choice(alphabet) for _ in range(length)) for _ in range(count)]
+
+
+def human_corpus(rng, count, length):
+    """Capitalized word plus digits/symbol, the most common human pattern"""
+    passwords = []
+    for _ in range(count):
+        stem = rng.choice(COMMON_WORDS).capitalize()
+        while len(stem) < length - 3:
+            stem += rng.choice(COMMON_WORDS)
+        passwords.append(f"{stem[:max(length - 3, 1)]}{rng.randrange(100):02d}{rng.choice(SYMBOLS)}")
+    return passwords
+
+
+def mutated_common_corpus(rng, count, length):
+    """Well-known passwords with case, leetspeak and suffix mutations"""
+    passwords = []
+    for _ in range(count):
+        password = rng.choice(COMMON_PASSWORDS)
+        if rng.random() < 0.5:
+            password = password.capitalize()
+        if rng.random() < 0.3:
+            password = password.translate(LEET)
+        while len(password) < length:
+            password += rng.choice(string.digits + SYMBOLS)
+        passwords.append(password)
+    return passwords
+
+
+def passphrase_corpus(rng, count, length):
+    """Space or dash separated words, roughly `length` characters long"""
+    passwords = []
+    for _ in range(count):
+        separator = rng.choice(" -_.")
+        words = [rng.choice(COMMON_WORDS)]
+        while len(separator.join(words)) < length:
+            words.append(rng.choice(COMMON_WORDS))
+        passwords.append(separator.join(words))
+    return passwords
+
+
+def unicode_corpus(rng, count, length):
+    """Mixed-script passwords with accents, eszett and emoji"""
+    alphabet = string.ascii_letters + string.digits + "éèàçüößÆØÅñ€£§_-" + "😀🔒🚀✨"
+    return ["".join(rng.choice(alphabet) for _ in range(length)) for _ in range(count)]
+
+
+CORPORA = {
+    "random": random_corpus,
+    "human": human_corpus,
+    "common": mutated_common_corpus,
+    "passphrase": passphrase_corpus,
+    "unicode": unicode_corpus,
+}
+
+
+def build_corpus(name, count, length, seed=0):
+    """Builds `count` passwords of about `length` characters from a named corpus"""
+    # Seed from the corpus name too, so corpora do not share random streams
+    rng = random.Random(f"{name}:{length}:{seed}")
+    return CORPORA[name](rng, count, length)
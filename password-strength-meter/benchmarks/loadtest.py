@@ -0,0 +1,157 @@
+"""
+Load-test harness for the password scoring service
+
+Sends batched /v1/score requests at a fixed target rate over a pool of
+keep-alive connections and reports achieved throughput and latency
+percentiles. Latency is measured from each request's scheduled send time,
+so a server that falls behind is not hidden by the client slowing down.
+
+    python password_service.py &
+    python benchmarks/loadtest.py --rps 500 --duration 10 --batch 20
+"""
+import argparse
+import asyncio
+import json
+import random
+import string
+import time
+
+
+def sample_passwords(count, seed):
+    """Builds a reproducible mix of weak and strong passwords"""
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + "!@#$%^&*"
+    words = ["password", "dragon", "sunshine", "welcome", "monkey", "qwerty"]
+    passwords = []
+    for _ in range(count):
+        if rng.random() < 0.3:
+            passwords.append(rng.choice(words) + str(rng.randrange(100)))
+        else:
+            passwords.append("".join(rng.choice(alphabet) for _ in range(rng.randrange(6, 24))))
+    return passwords
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection to the service"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, path, payload):
+        """Sends a JSON POST and returns (status, parsed body)"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode()
+        self.writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+            + body
+        )
+        await self.writer.drain()
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        data = await self.reader.readexactly(int(headers.get("content-length", "0")))
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, json.loads(data)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return float("nan")
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_load(host, port, rps, duration, batch, connections, seed):
+    """Drives the service at `rps` requests per second for `duration` seconds"""
+    pool = asyncio.Queue()
+    for _ in range(connections):
+        pool.put_nowait(Connection(host, port))
+    passwords = sample_passwords(max(batch * 50, 1000), seed)
+    latencies = []
+    errors = 0
+
+    async def one_request(scheduled, offset):
+        nonlocal errors
+        connection = await pool.get()
+        try:
+            chunk = [passwords[(offset + i) % len(passwords)] for i in range(batch)]
+            status, _ = await connection.request("/v1/score", {"passwords": chunk})
+            if status != 200:
+                errors += 1
+            latencies.append(time.perf_counter() - scheduled)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            errors += 1
+            connection.close()
+        finally:
+            pool.put_nowait(connection)
+
+    tasks = []
+    interval = 1 / rps
+    started = time.perf_counter()
+    total = int(rps * duration)
+    for index in range(total):
+        scheduled = started + index * interval
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(one_request(scheduled, index * batch)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    while not pool.empty():
+        pool.get_nowait().close()
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "achieved_rps": total / elapsed,
+        "passwords_per_s": total * batch / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": (latencies[-1] if latencies else float("nan")) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the password scoring service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rps", type=float, default=200, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load")
+    parser.add_argument("--batch", type=int, default=10, help="passwords per request")
+    parser.add_argument("--connections", type=int, default=16, help="keep-alive connections")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load(
+        args.host, args.port, args.rps, args.duration, args.batch, args.connections, args.seed
+    ))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"target {args.rps:.0f} rps, batch {args.batch}, {args.connections} connections")
+    print(f"requests:  {report['requests']} ({report['errors']} errors)")
+    print(f"achieved:  {report['achieved_rps']:.1f} rps, {report['passwords_per_s']:.0f} passwords/s")
+    print(f"latency:   p50 {report['p50_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms, max {report['max_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
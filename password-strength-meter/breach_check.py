@@ -0,0 +1,229 @@
+"""
+k-anonymity breach lookups against a Pwned Passwords style range API
+
+Only the first five hex characters of the password's SHA-1 ever leave the
+process: the server returns every hash suffix in that range with its
+breach count, and the match happens locally.
+
+Range responses are cached twice: a small in-memory LRU of hot prefixes
+and an on-disk LRU directory (one file per prefix, refreshed after a TTL).
+Concurrent lookups of the same prefix share one fetch, and fetches reuse
+keep-alive connections from a small pool.
+
+The range server is configured with PASSWORD_BREACH_RANGE_URL, e.g.
+https://api.pwnedpasswords.com/range/ or a local range_stub_server.py.
+"""
+import hashlib
+import http.client
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from urllib.parse import urlsplit
+
+RANGE_URL_ENV_VAR = "PASSWORD_BREACH_RANGE_URL"
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "password-strength-meter",
+    "breach-ranges",
+)
+PREFIX_LENGTH = 5
+
+
+class BreachCheckError(Exception):
+    """Raised when the range server cannot be reached or answers badly"""
+
+
+class ConnectionPool:
+    """A bounded pool of keep-alive HTTP(S) connections to one host"""
+
+    def __init__(self, url, size=4, timeout=5.0):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported range server URL {url!r}")
+        self._connection_class = (
+            http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        )
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path if parts.path.endswith("/") else parts.path + "/"
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def get(self, path, headers):
+        """GETs `path` (relative to the base URL); returns the body bytes"""
+        with self._slots:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                connection = self._connection_class(self.host, self.port, timeout=self.timeout)
+            # A pooled connection may have been closed by the server while
+            # idle, so a failure on a reused connection is retried once fresh
+            for attempt in range(2):
+                try:
+                    connection.request("GET", self.base_path + path, headers=headers)
+                    response = connection.getresponse()
+                    body = response.read()
+                except (OSError, http.client.HTTPException) as error:
+                    connection.close()
+                    if attempt:
+                        raise BreachCheckError(f"Range request failed: {error}") from error
+                    connection = self._connection_class(self.host, self.port, timeout=self.timeout)
+                    continue
+                if response.will_close:
+                    connection.close()
+                else:
+                    self._idle.put(connection)
+                if response.status != 200:
+                    raise BreachCheckError(f"Range server answered {response.status}")
+                return body
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class BreachChecker:
+    """Looks up breach counts for passwords via SHA-1 prefix ranges"""
+
+    def __init__(self, range_url, cache_dir=DEFAULT_CACHE_DIR, memory_entries=256,
+                 disk_entries=4096, ttl_seconds=7 * 24 * 3600, pool_size=4, timeout=5.0):
+        self.pool = ConnectionPool(range_url, pool_size, timeout)
+        self.cache_dir = cache_dir
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._hot = OrderedDict()  # prefix -> range text, most recent last
+        self._inflight = {}  # prefix -> Future shared by concurrent lookups
+        self._disk = OrderedDict()  # prefix -> None, least recently used first
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            entries = []
+            for name in os.listdir(cache_dir):
+                if name.endswith(".txt"):
+                    path = os.path.join(cache_dir, name)
+                    entries.append((os.path.getmtime(path), name[:-4]))
+            for _, prefix in sorted(entries):
+                self._disk[prefix] = None
+
+    def breach_count(self, password):
+        """Number of times `password` appears in the breach corpus (0 if never)"""
+        digest = hashlib.sha1(password.encode("utf-8")).hexdigest().upper()
+        prefix, suffix = digest[:PREFIX_LENGTH], digest[PREFIX_LENGTH:]
+        text = self.range_for(prefix)
+        start = text.find("\n" + suffix + ":")
+        if start < 0:
+            return 0
+        start += len(suffix) + 2
+        end = text.find("\n", start)
+        return int(text[start:end if end >= 0 else None].strip() or 0)
+
+    def range_for(self, prefix):
+        """
+        Returns the range text for a prefix ("\\nSUFFIX:COUNT" lines), from
+        memory, disk or the server, fetching each prefix at most once at a time
+        """
+        with self._lock:
+            text = self._hot.get(prefix)
+            if text is not None:
+                self._hot.move_to_end(prefix)
+                return text
+            future = self._inflight.get(prefix)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[prefix] = future
+
+        if not owner:
+            return future.result()
+
+        try:
+            text = self._read_disk(prefix)
+            if text is None:
+                body = self.pool.get(prefix, {"Add-Padding": "true", "User-Agent": "password-strength-meter"})
+                # Leading newline lets lookups anchor on "\nSUFFIX:"
+                text = "\n" + body.decode("ascii", "replace").replace("\r\n", "\n").strip()
+                self._write_disk(prefix, text)
+            with self._lock:
+                self._hot[prefix] = text
+                if len(self._hot) > self.memory_entries:
+                    self._hot.popitem(last=False)
+            future.set_result(text)
+            return text
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[prefix]
+
+    def _path(self, prefix):
+        return os.path.join(self.cache_dir, prefix + ".txt")
+
+    def _read_disk(self, prefix):
+        if not self.cache_dir:
+            return None
+        path = self._path(prefix)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                return None
+            with open(path, "r", encoding="ascii") as file:
+                text = file.read()
+        except OSError:
+            return None
+        with self._lock:
+            self._disk[prefix] = None
+            self._disk.move_to_end(prefix)
+        return text
+
+    def _write_disk(self, prefix, text):
+        if not self.cache_dir:
+            return
+        path = self._path(prefix)
+        temporary = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporary, "w", encoding="ascii") as file:
+                file.write(text)
+            os.replace(temporary, path)
+        except OSError:
+            return  # The cache is an optimization; lookups still succeed
+        with self._lock:
+            self._disk[prefix] = None
+            self._disk.move_to_end(prefix)
+            evicted = []
+            while len(self._disk) > self.disk_entries:
+                evicted.append(self._disk.popitem(last=False)[0])
+        for old_prefix in evicted:
+            try:
+                os.remove(self._path(old_prefix))
+            except OSError:
+                pass
+
+    def close(self):
+        self.pool.close()
+
+
+_default_checker = None
+_default_checker_lock = threading.Lock()
+
+
+def get_breach_checker():
+    """
+    Returns the process-wide checker for $PASSWORD_BREACH_RANGE_URL, or None
+    when breach checking is not configured
+    """
+    global _default_checker
+    url = os.environ.get(RANGE_URL_ENV_VAR)
+    if not url:
+        return None
+    with _default_checker_lock:
+        if _default_checker is None:
+            _default_checker = BreachChecker(url)
+        return _default_checker
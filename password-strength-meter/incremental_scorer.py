@@ -0,0 +1,63 @@
+"""
+Incremental keystroke scoring
+
+While a user types, each new input usually extends the previous one by a
+character or two. IncrementalScorer keeps the ScanState for every prefix
+it has seen, so an extension only scans the appended characters and a
+backspace just steps back to an earlier state.
+"""
+from password_policy import EMPTY_SCAN
+
+
+class IncrementalScorer:
+    """Per-session scorer that reuses the analysis of the previous input"""
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.text = ""
+        # states[i] is the ScanState after the first i characters of self.text
+        self.states = [EMPTY_SCAN]
+
+    def _resume_point(self, text):
+        """Length of the longest prefix of `text` whose state is already known"""
+        known = self.text
+        if text.startswith(known):
+            return len(known)
+        if known.startswith(text):
+            return len(text)
+        limit = min(len(known), len(text))
+        common = 0
+        while common < limit and known[common] == text[common]:
+            common += 1
+        return common
+
+    def score(self, text):
+        """Scores `text`, scanning only the characters not seen before"""
+        # Normalizing the whole input is a single C call; diffing the
+        # normalized text keeps composed characters consistent across keys
+        text = self.policy.normalize(text)
+        if not text:
+            self.text = ""
+            del self.states[1:]
+            return {"score": 0, "max_score": self.policy.max_score, "strength": "None", "feedback": ["Enter a password"]}
+
+        resume = self._resume_point(text)
+        del self.states[resume + 1:]
+        state = self.states[resume]
+        if state is None:
+            # Backspaced into a pasted block: rescan from the last saved state
+            start = resume
+            while self.states[start] is None:
+                start -= 1
+            state = self.policy.scan(self.states[start], text[start:resume])
+            self.states[resume] = state
+
+        if resume < len(text):
+            # Typed characters get a state each, so backspacing is O(1); a
+            # pasted block is scanned in one call and only its end is kept
+            appended = text[resume:]
+            state = self.policy.scan(state, appended)
+            self.states.extend([None] * (len(appended) - 1))
+            self.states.append(state)
+        self.text = text
+        return self.policy.result(state)
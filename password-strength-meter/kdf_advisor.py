@@ -0,0 +1,203 @@
+"""
+Password hashing cost advisor
+
+Measures how many hashes per second this machine computes for a set of
+key-derivation configurations and turns a guess estimate into the time an
+attacker with the same hardware would need. PBKDF2 and scrypt come with
+hashlib; bcrypt and Argon2id are measured when the optional `bcrypt` and
+`argon2-cffi` packages are installed.
+
+Measurements are cached on disk per host, so the benchmark only runs once
+per machine (or again when --refresh is given).
+
+    python kdf_advisor.py [--refresh]
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import socket
+import time
+from decimal import Decimal
+
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "password-strength-meter",
+)
+# Bump when configurations or the measurement method change, to drop old results
+CACHE_FORMAT = 1
+MIN_BENCHMARK_SECONDS = 0.25
+
+# (label, algorithm, parameters), cheapest first within each algorithm
+KDF_CONFIGS = (
+    ("PBKDF2-SHA256, 100k iterations", "pbkdf2_sha256", {"iterations": 100_000}),
+    ("PBKDF2-SHA256, 600k iterations", "pbkdf2_sha256", {"iterations": 600_000}),
+    ("scrypt, N=2^14 r=8 p=1 (16 MiB)", "scrypt", {"n": 2**14, "r": 8, "p": 1}),
+    ("scrypt, N=2^17 r=8 p=1 (128 MiB)", "scrypt", {"n": 2**17, "r": 8, "p": 1}),
+    ("bcrypt, cost 10", "bcrypt", {"rounds": 10}),
+    ("bcrypt, cost 12", "bcrypt", {"rounds": 12}),
+    ("Argon2id, t=2 m=19 MiB p=1", "argon2id", {"time_cost": 2, "memory_cost": 19 * 1024, "parallelism": 1}),
+    ("Argon2id, t=3 m=64 MiB p=4", "argon2id", {"time_cost": 3, "memory_cost": 64 * 1024, "parallelism": 4}),
+)
+
+SECONDS_PER_UNIT = (
+    ("years", 365 * 24 * 3600),
+    ("days", 24 * 3600),
+    ("hours", 3600),
+    ("minutes", 60),
+    ("seconds", 1),
+)
+
+_SAMPLE_PASSWORD = b"correct horse battery staple"
+_SAMPLE_SALT = b"0123456789abcdef"
+
+
+def make_hasher(algorithm, params):
+    """
+    Returns a zero-argument function computing one hash with the given
+    parameters, or None when the algorithm's package is not installed
+    """
+    if algorithm == "pbkdf2_sha256":
+        return lambda: hashlib.pbkdf2_hmac("sha256", _SAMPLE_PASSWORD, _SAMPLE_SALT, params["iterations"])
+    if algorithm == "scrypt":
+        # maxmem must cover 128 * r * N bytes plus some slack
+        maxmem = 129 * params["r"] * params["n"] + 1024 * 1024
+        return lambda: hashlib.scrypt(_SAMPLE_PASSWORD, salt=_SAMPLE_SALT, maxmem=maxmem, **params)
+    if algorithm == "bcrypt":
+        try:
+            import bcrypt
+        except ImportError:
+            return None
+        salt = bcrypt.gensalt(rounds=params["rounds"])
+        return lambda: bcrypt.hashpw(_SAMPLE_PASSWORD, salt)
+    if algorithm == "argon2id":
+        try:
+            from argon2.low_level import Type, hash_secret_raw
+        except ImportError:
+            return None
+        return lambda: hash_secret_raw(_SAMPLE_PASSWORD, _SAMPLE_SALT, hash_len=32, type=Type.ID, **params)
+    raise ValueError(f"Unknown KDF algorithm {algorithm!r}")
+
+
+def measure(hasher, min_seconds=MIN_BENCHMARK_SECONDS):
+    """Hashes per second on one core, timing at least `min_seconds` of work"""
+    hasher()  # Warm up allocations and lazy imports
+    count = 0
+    started = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_seconds:
+        hasher()
+        count += 1
+        elapsed = time.perf_counter() - started
+    return count / elapsed
+
+
+def run_benchmarks(configs=KDF_CONFIGS, min_seconds=MIN_BENCHMARK_SECONDS):
+    """
+    Measures every configuration whose package is available
+    Returns {label: hashes per second, or None when unavailable}
+    """
+    rates = {}
+    for label, algorithm, params in configs:
+        hasher = make_hasher(algorithm, params)
+        try:
+            rates[label] = measure(hasher, min_seconds) if hasher is not None else None
+        except (MemoryError, ValueError):
+            rates[label] = None  # e.g. scrypt beyond the OpenSSL memory limit
+    return rates
+
+
+def host_id():
+    """Identifies the machine the measurements belong to"""
+    return f"{socket.gethostname()}-{platform.machine()}-{os.cpu_count()}cpu"
+
+
+def _cache_path():
+    return os.path.join(CACHE_DIR, f"kdf-benchmark-{host_id()}.json")
+
+
+def load_cached_benchmarks():
+    """Returns the cached measurements for this host, or None"""
+    try:
+        with open(_cache_path(), "r", encoding="utf-8") as file:
+            cached = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if cached.get("format") != CACHE_FORMAT:
+        return None
+    return cached
+
+
+def get_benchmarks(refresh=False):
+    """
+    Returns {"host", "measured_at", "rates"} for this machine, running the
+    benchmark (several seconds) only when nothing is cached yet
+    """
+    if not refresh:
+        cached = load_cached_benchmarks()
+        if cached is not None:
+            return cached
+
+    benchmarks = {
+        "format": CACHE_FORMAT,
+        "host": host_id(),
+        "measured_at": time.time(),
+        "rates": run_benchmarks(),
+    }
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        path = _cache_path()
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(benchmarks, file, indent=2)
+        os.replace(temporary, path)
+    except OSError:
+        pass  # Only costs a re-run next time
+    return benchmarks
+
+
+def crack_seconds(guesses, hashes_per_second):
+    """
+    Expected time to find a password (half the guess space on average), in
+    whole seconds. Integer arithmetic, since guess counts for long passwords
+    are far beyond the float range
+    """
+    return int(guesses) * 500 // max(round(hashes_per_second * 1000), 1)
+
+
+def format_duration(seconds):
+    """Formats a duration with the largest fitting unit, e.g. "3.2 days" """
+    if seconds < 1:
+        return "less than a second"
+    for unit, size in SECONDS_PER_UNIT:
+        if seconds >= size:
+            if unit == "years" and seconds >= size * 10**6:
+                return f"{Decimal(seconds) / size:.1e} years"
+            return f"{seconds / size:,.1f} {unit}"
+
+
+def crack_time_table(guesses, rates):
+    """Rows of (label, hashes per second, crack time text) for available configurations"""
+    rows = []
+    for label, _, _ in KDF_CONFIGS:
+        rate = rates.get(label)
+        if rate:
+            rows.append((label, rate, format_duration(crack_seconds(guesses, rate))))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark password hashing costs on this machine")
+    parser.add_argument("--refresh", action="store_true", help="re-run even if results are cached")
+    args = parser.parse_args()
+
+    benchmarks = get_benchmarks(refresh=args.refresh)
+    print(f"KDF throughput on {benchmarks['host']} (one core)")
+    for label, _, _ in KDF_CONFIGS:
+        rate = benchmarks["rates"].get(label)
+        print(f"  {label:<36} {f'{rate:,.1f} hashes/s' if rate else 'not installed'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Diceware-style passphrase generation
+
+The wordlist is stored as one compact binary file that is memory-mapped
+rather than loaded as a Python list of strings:
+
+    magic   8 bytes   b"PWLIST1\\0"
+    count   uint32    number of words (little endian)
+    offsets uint32 x (count + 1)
+    blob    UTF-8 words back to back; word i is blob[offsets[i]:offsets[i + 1]]
+
+Word indices are drawn with secrets in bulk and mapped by rejection
+sampling, so every word is equally likely and each passphrase carries
+word_count * log2(len(wordlist)) bits of entropy.
+
+    python passphrase.py build --source words.txt     # compile a plaintext list
+    python passphrase.py generate --count 5 --words 6
+"""
+import argparse
+import itertools
+import math
+import mmap
+import os
+import random
+import secrets
+import struct
+import sys
+from array import array
+from collections import namedtuple
+
+DEFAULT_WORDLIST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wordlist.bin")
+MAGIC = b"PWLIST1\0"
+HEADER = struct.Struct("<8sI")
+
+Passphrase = namedtuple("Passphrase", ["text", "entropy_bits"])
+
+
+class Wordlist:
+    """A read-only, memory-mapped wordlist"""
+
+    def __init__(self, path=DEFAULT_WORDLIST):
+        self.path = path
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or self.count < 2:
+            raise ValueError(f"{path} is not a compiled wordlist")
+        offsets_end = HEADER.size + 4 * (self.count + 1)
+        if sys.byteorder == "little":
+            self._offsets = memoryview(self._map)[HEADER.size:offsets_end].cast("I")
+        else:
+            # Offsets are stored little endian; big-endian hosts need a swapped copy
+            self._offsets = array("I", self._map[HEADER.size:offsets_end])
+            self._offsets.byteswap()
+        self._blob = memoryview(self._map)[offsets_end:]
+        self.bits_per_word = math.log2(self.count)
+
+    def __len__(self):
+        return self.count
+
+    def word_bytes(self, index):
+        """Zero-copy view of word `index`"""
+        return self._blob[self._offsets[index]:self._offsets[index + 1]]
+
+    def word(self, index):
+        return bytes(self.word_bytes(index)).decode("utf-8")
+
+    def close(self):
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        self._blob.release()
+        self._map.close()
+
+
+def random_indices(count, bound):
+    """
+    Returns `count` uniform random integers in [0, bound) from one bulk
+    secrets draw, rejecting 32-bit values past the last multiple of `bound`
+    """
+    limit = (1 << 32) - (1 << 32) % bound
+    indices = []
+    while len(indices) < count:
+        missing = count - len(indices)
+        raw = array("I", secrets.token_bytes(4 * (missing + missing // 8 + 4)))
+        indices.extend(value % bound for value in raw if value < limit)
+    del indices[count:]
+    return indices
+
+
+def generate_passphrases(count, word_count=6, separator="-", wordlist=None):
+    """
+    Generates `count` passphrases of `word_count` words in one batch
+    Words are joined as bytes straight from the mapped wordlist, so the only
+    string allocated per passphrase is the passphrase itself
+    """
+    if word_count < 1:
+        raise ValueError("word_count must be at least 1")
+    wordlist = wordlist or get_default_wordlist()
+    entropy = word_count * wordlist.bits_per_word
+    joiner = separator.encode("utf-8")
+    word_bytes = wordlist.word_bytes
+    indices = iter(random_indices(count * word_count, len(wordlist)))
+    return [
+        Passphrase(joiner.join(map(word_bytes, itertools.islice(indices, word_count))).decode("utf-8"), entropy)
+        for _ in range(count)
+    ]
+
+
+def generate_passphrase(word_count=6, separator="-", wordlist=None):
+    """Generates a single passphrase"""
+    return generate_passphrases(1, word_count, separator, wordlist)[0]
+
+
+_default_wordlist = None
+
+
+def get_default_wordlist():
+    """Maps the bundled wordlist once per process"""
+    global _default_wordlist
+    if _default_wordlist is None:
+        _default_wordlist = Wordlist(DEFAULT_WORDLIST)
+    return _default_wordlist
+
+
+def build_wordlist(words, path):
+    """Compiles an iterable of words into the binary wordlist format"""
+    unique = sorted(set(word.strip() for word in words if word.strip()))
+    if len(unique) < 2:
+        raise ValueError("A wordlist needs at least two distinct words")
+    encoded = [word.encode("utf-8") for word in unique]
+    offsets = array("I", [0])
+    for word in encoded:
+        offsets.append(offsets[-1] + len(word))
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, len(encoded)))
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        file.write(offsets.tobytes())
+        file.write(b"".join(encoded))
+    return len(encoded)
+
+
+def syllable_words(count):
+    """
+    Deterministic pronounceable words (consonant-vowel syllables), used to
+    build the bundled list when no plaintext source list is given
+    """
+    onsets = "b d f g h j k l m n p r s t v z".split() + ["br", "dr", "gr", "kr", "pl", "st", "tr"]
+    vowels = ["a", "e", "i", "o", "u"]
+    codas = ["", "n", "r", "s", "l", "m"]
+    syllables = [onset + vowel for onset in onsets for vowel in vowels]
+    words = [first + second + coda for first in syllables for second in syllables for coda in codas]
+    # Fixed seed: the list is public, only the choice of words at generation time is secret
+    return random.Random("passphrase-wordlist").sample(words, min(count, len(words)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Passphrase wordlist builder and generator")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="compile a plaintext wordlist (one word per line)")
+    build.add_argument("--source", help="plaintext wordlist; default: generated syllable words")
+    build.add_argument("--size", type=int, default=8192, help="generated wordlist size")
+    build.add_argument("--out", default=DEFAULT_WORDLIST)
+
+    generate = commands.add_parser("generate", help="print passphrases, one per line")
+    generate.add_argument("--count", type=int, default=1)
+    generate.add_argument("--words", type=int, default=6)
+    generate.add_argument("--separator", default="-")
+    generate.add_argument("--wordlist", default=DEFAULT_WORDLIST)
+
+    args = parser.parse_args()
+    if args.command == "build":
+        if args.source:
+            with open(args.source, encoding="utf-8") as file:
+                size = build_wordlist(file, args.out)
+        else:
+            size = build_wordlist(syllable_words(args.size), args.out)
+        print(f"Wrote {size} words ({math.log2(size):.2f} bits/word) to {args.out}")
+        return
+
+    wordlist = Wordlist(args.wordlist)
+    out = sys.stdout
+    for start in range(0, args.count, 100_000):
+        batch = generate_passphrases(min(100_000, args.count - start), args.words, args.separator, wordlist)
+        out.write("".join(f"{passphrase.text}\n" for passphrase in batch))
+    print(f"{args.words * wordlist.bits_per_word:.1f} bits of entropy each", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
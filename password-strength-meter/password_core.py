@@ -0,0 +1,168 @@
+"""
+Password strength scoring and generation core
+
+Importable without Streamlit, so the app, the HTTP scoring service and
+other internal tools all share the same scoring and generation logic.
+"""
+import secrets
+import string
+from functools import lru_cache
+
+from breach_check import BreachCheckError
+from password_policy import PolicyError, load_policy
+from patterns import find_patterns
+
+
+BREACH_FEEDBACK = "This password has appeared in {count:,} known data breaches"
+
+def check_password_strength(password, policy=None, breach_checker=None):
+    """
+    Analyzes password strength against a policy (default: the active one)
+    and, when a breach checker is given, against known breaches
+    Returns a score and feedback
+    """
+    policy = policy or load_policy()
+    if not password:
+        return {"score": 0, "max_score": policy.max_score, "strength": "None", "feedback": ["Enter a password"]}
+    
+    result = policy.evaluate(password)
+    if breach_checker is not None:
+        apply_breach_check(result, password, policy, breach_checker)
+    return result
+
+def apply_breach_check(result, password, policy, breach_checker):
+    """
+    Adds "breach_count" to a scoring result, forcing a weak score for
+    breached passwords. An unreachable range server leaves the count None
+    """
+    try:
+        # The range API indexes passwords exactly as typed, so no normalization
+        count = breach_checker.breach_count(password)
+    except BreachCheckError:
+        result["breach_count"] = None
+        return result
+    return apply_breach_count(result, count, policy)
+
+def apply_breach_count(result, count, policy):
+    """Adds an already looked up breach count to a scoring result"""
+    result["breach_count"] = count
+    if count:
+        result["score"] = min(result["score"], 1)  # Force a weak score
+        result["strength"] = policy.strength_for(result["score"])
+        result["feedback"] = result["feedback"] + [BREACH_FEEDBACK.format(count=count)]
+    return result
+
+# Alphabet sizes an attacker brute-forcing a password would have to cover
+# for each kind of character it contains
+ASCII_POOLS = (
+    (frozenset(string.ascii_lowercase), 26),
+    (frozenset(string.ascii_uppercase), 26),
+    (frozenset(string.digits), 10),
+    (frozenset(string.punctuation + " "), 33),
+)
+NON_ASCII_POOL = 100
+# Breached passwords are in every cracking wordlist; roughly its size
+BREACHED_GUESSES = 10**9
+# Guesses to enumerate one keyboard walk or sequence (layout, start key, direction)
+PATTERN_GUESSES = 1000
+
+def estimate_guesses(password, result, policy=None):
+    """
+    Rough number of guesses an offline attacker needs for a password: its
+    blocklist position for blocklisted passwords, a wordlist run for
+    breached ones, and brute force over the character pools it uses otherwise
+    """
+    policy = policy or load_policy()
+    password = policy.normalize(password)
+    if result.get("blocklisted"):
+        return max(len(policy.blocklist), 1)
+    
+    present = set(password)
+    pool = sum(size for chars, size in ASCII_POOLS if not present.isdisjoint(chars))
+    if any(char > "~" for char in present):
+        pool += NON_ASCII_POOL
+    # Walks and sequences are guessed as a whole rather than per character
+    matches = find_patterns(password)
+    brute_force_length = len(password) - sum(len(match.token) for match in matches)
+    guesses = max(pool, 1) ** brute_force_length * PATTERN_GUESSES ** len(matches)
+    if result.get("breach_count"):
+        guesses = min(guesses, BREACHED_GUESSES)
+    return guesses
+
+def check_passwords(passwords, policy=None, breach_checker=None):
+    """Scores a batch of passwords against one policy"""
+    policy = policy or load_policy()
+    return [check_password_strength(password, policy, breach_checker) for password in passwords]
+
+# Random bytes at or above the accept limit are rejected so that
+# `byte % len(alphabet)` stays uniform (no modulo bias). The translation
+# table maps every accepted byte straight to its alphabet character, so a
+# whole batch is mapped in C.
+@lru_cache(maxsize=None)
+def _byte_tables(alphabet):
+    """Returns (accept limit, translation table, rejected bytes) for an alphabet"""
+    accept_limit = 256 - 256 % len(alphabet)
+    byte_to_char = bytes(
+        ord(alphabet[b % len(alphabet)]) if b < accept_limit else 0
+        for b in range(256)
+    )
+    return accept_limit, byte_to_char, bytes(range(accept_limit, 256))
+
+# Generation gives up (PolicyError) after this many rejected candidates per password
+MAX_CANDIDATES_PER_PASSWORD = 10_000
+
+def _random_alphabet_chars(count, alphabet):
+    """
+    Returns `count` uniformly random alphabet characters as a string,
+    drawing the bytes from the OS CSPRNG in as few calls as possible
+    """
+    accept_limit, byte_to_char, rejected_bytes = _byte_tables(alphabet)
+    chunks = []
+    needed = count
+    while needed > 0:
+        # Over-draw slightly to cover rejected bytes in a single call
+        raw = secrets.token_bytes(needed * 256 // accept_limit + 16)
+        chunk = raw.translate(byte_to_char, rejected_bytes)[:needed]
+        chunks.append(chunk)
+        needed -= len(chunk)
+    return b"".join(chunks).decode("ascii")
+
+def generate_strong_passwords(count, length=12, policy=None):
+    """
+    Generates `count` strong passwords of specified length in one batch
+    Candidates that miss a required character class or break another
+    policy rule are rejected, so results are uniform over all compliant
+    passwords
+    """
+    policy = policy or load_policy()
+    if length < policy.min_length:
+        length = policy.min_length  # Minimum secure length [^1]
+    
+    passwords = []
+    attempts = 0
+    while len(passwords) < count:
+        if attempts >= MAX_CANDIDATES_PER_PASSWORD * count:
+            # Rules like a blocklist or a tiny max_pattern_length can make
+            # compliant passwords of this length (almost) impossible
+            raise PolicyError(f"Could not generate a {length}-character password that meets policy {policy.key}")
+        missing = count - len(passwords)
+        # Short passwords miss a class more often; draw extra candidates up front
+        candidates = missing + missing // 2 + 8
+        attempts += candidates
+        chars = _random_alphabet_chars(candidates * length, policy.alphabet)
+        for start in range(0, len(chars), length):
+            candidate = chars[start:start + length]
+            if not policy.is_compliant(candidate):
+                continue
+            passwords.append(candidate)
+            if len(passwords) == count:
+                break
+    
+    return passwords
+
+def generate_strong_password(length=12, policy=None):
+    """
+    Generates a strong password of specified length
+    Ensures it contains all required character types
+    """
+    return generate_strong_passwords(1, length, policy)[0]
@@ -0,0 +1,527 @@
+"""
+Configurable password policy engine
+
+Policies are declared in JSON (or YAML, when PyYAML is installed) and
+compiled once into a PasswordPolicy. Compiled policies are cached by the
+content of their rules, so scoring and generation never re-parse rules per call.
+"""
+import hashlib
+import json
+import os
+import re
+import string
+import unicodedata
+
+from patterns import longest_run, scan_runs, to_scan_bytes
+from unicode_classes import CATEGORIES, class_table
+
+DEFAULT_POLICY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "default_policy.json")
+POLICY_ENV_VAR = "PASSWORD_POLICY_FILE"
+
+# Character classes policies can require without defining them. Characters
+# count by their Unicode general category; "chars" lists the ASCII characters
+# the generator draws from (and counts even if their category does not match)
+BUILTIN_CLASSES = {
+    "uppercase": {
+        "chars": string.ascii_uppercase,
+        "categories": ["Lu", "Lt"],
+        "label": "Uppercase letters",
+        "feedback": "Add uppercase letters",
+    },
+    "lowercase": {
+        "chars": string.ascii_lowercase,
+        "categories": ["Ll"],
+        "label": "Lowercase letters",
+        "feedback": "Add lowercase letters",
+    },
+    "digits": {
+        "chars": string.digits,
+        "categories": ["Nd"],
+        "label": "Numbers",
+        "feedback": "Add at least one number",
+    },
+    "special": {
+        "chars": "!@#$%^&*",
+        "categories": ["P", "S"],
+        "label": "Special characters",
+        "feedback": "Add special characters (e.g. !@#$%^&*)",
+    },
+}
+MAX_REQUIRED_CLASSES = 8
+
+POLICY_KEYS = {
+    "name", "version", "min_length", "required_classes", "classes",
+    "blocklist", "blocklist_file", "max_repeats", "banned_substrings", "thresholds",
+    "normalize", "max_pattern_length",
+}
+CLASS_KEYS = {"chars", "categories", "label", "feedback"}
+
+BLOCKLIST_FEEDBACK = "This is a commonly used password and easily guessable"
+
+
+class PolicyError(ValueError):
+    """Raised when a policy document is malformed"""
+
+
+class SubstringAutomaton:
+    """
+    Aho-Corasick automaton over casefolded banned substrings
+
+    The matcher state is a single int, so a scan can stop after any prefix
+    and resume with the appended characters only.
+    """
+
+    def __init__(self, words):
+        self._goto = [{}]
+        self._fail = [0]
+        self._hit = [False]
+        for word in words:
+            node = 0
+            for char in word:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._hit.append(False)
+                node = next_node
+            self._hit[node] = True
+
+        # Breadth-first fail links; a node is a hit if any suffix is a word
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._hit[child] = self._hit[child] or self._hit[self._fail[child]]
+                queue.append(child)
+
+    def advance(self, node, text):
+        """Feeds `text` from matcher state `node`; returns (new state, matched)"""
+        goto = self._goto
+        fail = self._fail
+        hit = self._hit
+        matched = False
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if hit[node]:
+                matched = True
+        return node, matched
+
+
+class ScanState:
+    """
+    Everything evaluation needs to know about a scanned prefix
+
+    States are never mutated once returned by PasswordPolicy.scan, so
+    callers can keep earlier states around and resume from any of them.
+    """
+
+    __slots__ = ("length", "mask", "previous", "run", "repeat_violation",
+                 "match_node", "banned_hit", "folded",
+                 "pattern_previous", "pattern_active", "pattern_run", "pattern_longest")
+
+    def __init__(self):
+        self.length = 0
+        self.mask = 0
+        # Last character and how many times it repeats at the end of the prefix
+        self.previous = ""
+        self.run = 0
+        self.repeat_violation = False
+        self.match_node = 0
+        self.banned_hit = False
+        # Casefolded text, only kept while it could still be a blocklist entry
+        self.folded = ""
+        # Keyboard-walk/sequence scan state (see patterns.scan_runs)
+        self.pattern_previous = 0
+        self.pattern_active = 0
+        self.pattern_run = 0
+        self.pattern_longest = 0
+
+    def copy(self):
+        state = ScanState.__new__(ScanState)
+        for name in ScanState.__slots__:
+            setattr(state, name, getattr(self, name))
+        return state
+
+
+class PasswordPolicy:
+    """
+    A compiled password policy
+
+    All rule parsing happens in the constructor. Evaluation is one fused
+    scan that collects character classes, repeat runs, keyboard walks and
+    sequences, banned-substring matches and the blocklist candidate; the
+    scan can be resumed from a saved ScanState, which is what the
+    incremental scorer uses while the user types.
+    """
+
+    def __init__(self, rules, base_dir=None):
+        unknown = set(rules) - POLICY_KEYS
+        if unknown:
+            raise PolicyError(f"Unknown policy keys: {', '.join(sorted(unknown))}")
+
+        self.name = str(rules.get("name", "custom"))
+        self.version = str(rules.get("version", "1"))
+        self.key = f"{self.name}@{self.version}"
+        # Unique per rule set, unlike the declared name and version
+        self.cache_key = f"{self.key}#{policy_fingerprint(rules, base_dir)}"
+        self.rules = rules
+
+        self.min_length = int(rules.get("min_length", 8))
+        if self.min_length < 1:
+            raise PolicyError("min_length must be at least 1")
+
+        classes = {name: dict(spec) for name, spec in BUILTIN_CLASSES.items()}
+        for name, spec in rules.get("classes", {}).items():
+            unknown = set(spec) - CLASS_KEYS
+            if unknown:
+                raise PolicyError(f"Unknown keys for class '{name}': {', '.join(sorted(unknown))}")
+            if "chars" not in spec and "categories" not in spec:
+                raise PolicyError(f"Class '{name}' needs 'chars' or 'categories'")
+            merged = {"label": name.capitalize(), "feedback": f"Add {name} characters"}
+            merged.update(spec)
+            classes[name] = merged
+
+        required = rules.get("required_classes", ["uppercase", "lowercase", "digits", "special"])
+        for name in required:
+            if name not in classes:
+                raise PolicyError(f"Required class '{name}' is not defined")
+
+        if len(required) > MAX_REQUIRED_CLASSES:
+            raise PolicyError(f"At most {MAX_REQUIRED_CLASSES} required classes are supported")
+
+        self.normalization = rules.get("normalize", "NFKC")
+        if self.normalization not in (None, "NFC", "NFKC", "NFD", "NFKD"):
+            raise PolicyError(f"Unknown normalization form {self.normalization!r}")
+
+        # Each required class gets one bit. The codepoint -> bits table is
+        # derived from the shared category table, so classifying a character
+        # is one table index instead of a unicodedata call
+        self.required_classes = tuple(required)
+        self.class_specs = tuple(classes[name] for name in required)
+        self._class_chars = tuple(frozenset(spec.get("chars", "")) for spec in self.class_specs)
+        category_bits = [0] * len(CATEGORIES)
+        char_bits = {}
+        for index, spec in enumerate(self.class_specs):
+            prefixes = tuple(spec.get("categories", ()))
+            for category_index, category in enumerate(CATEGORIES):
+                if prefixes and category.startswith(prefixes):
+                    category_bits[category_index] |= 1 << index
+            for char in spec.get("chars", ""):
+                char_bits[char] = char_bits.get(char, 0) | 1 << index
+        self._class_table = class_table(category_bits, char_bits)
+        self._full_class_mask = (1 << len(required)) - 1
+
+        self.max_repeats = rules.get("max_repeats")
+        if self.max_repeats is not None:
+            self.max_repeats = int(self.max_repeats)
+            if self.max_repeats < 1:
+                raise PolicyError("max_repeats must be at least 1")
+        # Matches any run longer than max_repeats
+        self._repeat_pattern = (
+            re.compile(r"(.)\1{%d}" % self.max_repeats, re.DOTALL)
+            if self.max_repeats is not None else None
+        )
+
+        self.max_pattern_length = rules.get("max_pattern_length")
+        if self.max_pattern_length is not None:
+            self.max_pattern_length = int(self.max_pattern_length)
+            if self.max_pattern_length < 2:
+                raise PolicyError("max_pattern_length must be at least 2")
+
+        banned = [s.casefold() for s in rules.get("banned_substrings", []) if s]
+        self.banned_substrings = tuple(banned)
+        self._banned_matcher = SubstringAutomaton(banned) if banned else None
+        # Only used by the generator's quick compliance check
+        self._banned_pattern = (
+            re.compile("|".join(re.escape(s) for s in sorted(banned, key=len, reverse=True)))
+            if banned else None
+        )
+
+        blocklist = set(word.casefold() for word in rules.get("blocklist", []))
+        if rules.get("blocklist_file"):
+            path = blocklist_path(rules, base_dir)
+            try:
+                with open(path, "r", encoding="utf-8") as file:
+                    blocklist.update(line.strip().casefold() for line in file if line.strip())
+            except OSError as error:
+                raise PolicyError(f"Cannot read blocklist file {path}: {error}") from error
+        self.blocklist = frozenset(blocklist)
+        self._longest_blocked = max(map(len, self.blocklist), default=0)
+
+        # Criteria in display order: (key, label, feedback)
+        criteria = [(
+            "length",
+            f"Length ({self.min_length}+ characters)",
+            f"Password should be at least {self.min_length} characters long",
+        )]
+        for name, spec in zip(self.required_classes, self.class_specs):
+            criteria.append((name, spec["label"], spec["feedback"]))
+        if self.max_repeats is not None:
+            criteria.append((
+                "repeats",
+                f"No more than {self.max_repeats} repeated characters",
+                f"Avoid repeating a character more than {self.max_repeats} times in a row",
+            ))
+        if self.max_pattern_length is not None:
+            criteria.append((
+                "patterns",
+                "No keyboard walks or sequences",
+                "Avoid keyboard patterns like 'qwerty' and sequences like 'abcd' or '1234'",
+            ))
+        if self._banned_pattern is not None:
+            criteria.append(("substrings", "No banned words", "Remove banned words or names"))
+        self.criteria = tuple(criteria)
+        self.max_score = len(self.criteria)
+
+        thresholds = rules.get("thresholds", {})
+        self.weak_threshold = int(thresholds.get("weak", round(self.max_score * 0.4)))
+        self.moderate_threshold = int(thresholds.get("moderate", self.max_score - 1))
+
+        # Generation draws from the printable ASCII characters of every required
+        # class, which keeps the generator's alphabet within a single byte
+        ascii_sets = (frozenset(c for c in chars if " " < c <= "~") for chars in self._class_chars)
+        self.generation_sets = tuple(chars for chars in ascii_sets if chars)
+        alphabet = "".join(sorted(set().union(*self.generation_sets))) if self.generation_sets else ""
+        self.alphabet = alphabet or string.ascii_letters + string.digits
+        # A password needs at least one character of every class it must contain
+        if self.min_length < len(self.generation_sets):
+            raise PolicyError(
+                f"min_length ({self.min_length}) must be at least the number of required classes "
+                f"({len(self.generation_sets)})"
+            )
+
+    def normalize(self, text):
+        """Applies the policy's Unicode normalization form (NFKC by default)"""
+        if self.normalization is None or unicodedata.is_normalized(self.normalization, text):
+            return text
+        return unicodedata.normalize(self.normalization, text)
+
+    def class_mask(self, text, mask=0):
+        """
+        Required-class bits present in `text`: one pass over its code points
+        against the class table, stopping as soon as every class is seen
+        """
+        class_bits = self._class_table
+        full = self._full_class_mask
+        if mask == full:
+            return mask
+        for char in text:
+            mask |= class_bits[ord(char)]
+            if mask == full:
+                break
+        return mask
+
+    def scan(self, state, text):
+        """
+        Returns a new ScanState for the state's prefix followed by `text`
+        Work is proportional to len(text), not to the whole password.
+        The text must already be normalized (see normalize)
+        """
+        state = state.copy()
+        if not text:
+            return state
+        state.length += len(text)
+        state.mask = self.class_mask(text, state.mask)
+
+        if self._repeat_pattern is not None:
+            # Carry the trailing run of the prefix into the search, so runs
+            # spanning keystrokes are seen; the regex does the scan in C
+            if not state.repeat_violation:
+                carried = state.previous * min(state.run, self.max_repeats)
+                state.repeat_violation = self._repeat_pattern.search(carried + text) is not None
+            last = text[-1]
+            trailing = len(text) - len(text.rstrip(last))
+            if trailing == len(text) and last == state.previous:
+                state.run += trailing
+            else:
+                state.run = trailing
+            state.previous = last
+
+        if self.max_pattern_length is not None and state.pattern_longest <= self.max_pattern_length:
+            (state.pattern_previous, state.pattern_active,
+             state.pattern_run, state.pattern_longest) = scan_runs(
+                to_scan_bytes(text), state.pattern_previous, state.pattern_active,
+                state.pattern_run, state.pattern_longest,
+            )
+        if self._banned_matcher is not None and not state.banned_hit:
+            state.match_node, state.banned_hit = self._banned_matcher.advance(
+                state.match_node, text.casefold()
+            )
+        if state.length <= self._longest_blocked:
+            state.folded += text.casefold()
+        else:
+            state.folded = ""
+        return state
+
+    def result(self, state):
+        """Turns a ScanState into a scoring result"""
+        results = [state.length >= self.min_length]
+        results.extend(bool(state.mask >> index & 1) for index in range(len(self.required_classes)))
+        if self.max_repeats is not None:
+            results.append(not state.repeat_violation)
+        if self.max_pattern_length is not None:
+            results.append(state.pattern_longest <= self.max_pattern_length)
+        if self._banned_matcher is not None:
+            results.append(not state.banned_hit)
+
+        score = 0
+        criteria_mask = 0
+        feedback = []
+        criteria_met = {}
+        for index, ((key, _, message), met) in enumerate(zip(self.criteria, results)):
+            criteria_met[key] = met
+            if met:
+                score += 1
+                criteria_mask |= 1 << index
+            else:
+                feedback.append(message)
+
+        blocklisted = state.length <= self._longest_blocked and state.folded in self.blocklist
+        if blocklisted:
+            score = 1  # Force a weak score
+            feedback.append(BLOCKLIST_FEEDBACK)
+
+        return {
+            "score": score,
+            "max_score": self.max_score,
+            "strength": self.strength_for(score),
+            "feedback": feedback,
+            "criteria": criteria_met,
+            "criteria_mask": criteria_mask,
+            "blocklisted": blocklisted,
+        }
+
+    def evaluate(self, password):
+        """
+        Scores a password against the policy
+        Returns the score, strength, feedback and per-criterion results
+        """
+        return self.result(self.scan(EMPTY_SCAN, self.normalize(password)))
+
+    def strength_for(self, score):
+        """Maps a score to its strength category"""
+        if score <= self.weak_threshold:
+            return "Weak"
+        elif score <= self.moderate_threshold:
+            return "Moderate"
+        return "Strong"
+
+    def is_compliant(self, candidate):
+        """
+        Quick check used by the generator: contains every generation class
+        and breaks none of the blocklist, repeat or substring rules
+        """
+        present = set(candidate)
+        for chars in self.generation_sets:
+            if present.isdisjoint(chars):
+                return False
+        if self.blocklist and candidate.casefold() in self.blocklist:
+            return False
+        if self._repeat_pattern is not None and self._repeat_pattern.search(candidate):
+            return False
+        if self.max_pattern_length is not None and longest_run(candidate) > self.max_pattern_length:
+            return False
+        if self._banned_pattern is not None and self._banned_pattern.search(candidate.casefold()):
+            return False
+        return True
+
+
+# Starting point for every scan
+EMPTY_SCAN = ScanState()
+
+
+def read_policy_file(path):
+    """Parses a JSON or YAML policy document into a dict"""
+    with open(path, "r", encoding="utf-8") as file:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError as error:
+                raise PolicyError("YAML policies need PyYAML (pip install pyyaml)") from error
+            rules = yaml.safe_load(file)
+        else:
+            rules = json.load(file)
+    if not isinstance(rules, dict):
+        raise PolicyError(f"Policy file {path} must contain a mapping")
+    return rules
+
+
+def blocklist_path(rules, base_dir=None):
+    """Path of the policy's blocklist file, or None when it has none"""
+    if "blocklist_file" not in rules:
+        return None
+    return os.path.join(base_dir or "", rules["blocklist_file"])
+
+
+def _modified(path):
+    """A file's mtime in ns (None when there is no file), for change checks"""
+    if path is None:
+        return None
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def policy_fingerprint(rules, base_dir=None):
+    """
+    Returns a short digest of a policy's rules, the directory its files are
+    read from and when its blocklist file last changed
+    """
+    blocklist_modified = _modified(blocklist_path(rules, base_dir))
+    canonical = json.dumps([rules, base_dir, blocklist_modified], sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+# Compiled policies keyed by their cache_key, so two policies that declare the
+# same name and version (or an edited file whose version was not bumped) never
+# share a compilation
+_compiled_policies = {}
+# Parsed policy files keyed by path, invalidated when the mtime of the file
+# or of its blocklist file changes
+_loaded_files = {}
+
+
+def compile_policy(rules, base_dir=None):
+    """Compiles a policy dict, reusing the cached compilation of identical rules"""
+    key = f"{rules.get('name', 'custom')}@{rules.get('version', '1')}#{policy_fingerprint(rules, base_dir)}"
+    policy = _compiled_policies.get(key)
+    if policy is None:
+        policy = PasswordPolicy(rules, base_dir)
+        _compiled_policies[policy.cache_key] = policy
+    return policy
+
+
+def get_policy(key):
+    """Returns a previously compiled policy by its cache_key"""
+    try:
+        return _compiled_policies[key]
+    except KeyError:
+        raise PolicyError(f"Policy {key} has not been compiled") from None
+
+
+def load_policy(path=None):
+    """
+    Loads and compiles the policy at `path` (default: $PASSWORD_POLICY_FILE
+    or the bundled default policy). Only re-reads the file when it changed.
+    """
+    path = path or os.environ.get(POLICY_ENV_VAR) or DEFAULT_POLICY_FILE
+    mtime = os.stat(path).st_mtime_ns
+    cached = _loaded_files.get(path)
+    if cached is not None and cached[0] == mtime and _modified(cached[1]) == cached[2]:
+        return cached[3]
+    base_dir = os.path.dirname(os.path.abspath(path))
+    rules = read_policy_file(path)
+    blocklist = blocklist_path(rules, base_dir)
+    blocklist_modified = _modified(blocklist)
+    policy = compile_policy(rules, base_dir)
+    _loaded_files[path] = (mtime, blocklist, blocklist_modified, policy)
+    return policy
@@ -0,0 +1,366 @@
+"""
+Headless password-strength scoring service
+
+A small asyncio HTTP/1.1 server exposing the same scoring and generation
+as the Streamlit app. Connections are kept alive by default and requests
+pipelined on one connection are answered in order.
+
+Endpoints:
+    GET  /healthz              liveness and active policy
+    POST /v1/score             {"passwords": [...]} -> {"results": [...]}
+    POST /v1/generate          {"count": n, "length": l} -> {"passwords": [...]}
+    POST /v1/score/stream      newline-delimited JSON passwords in, one result
+                               line out per input line as soon as it is read
+
+Run with:
+    python password_service.py --host 127.0.0.1 --port 8765 [--workers 4]
+
+With --workers the scoring data is loaded once and the process forks that
+many workers sharing one listening socket, so the data is shared
+copy-on-write rather than loaded per worker.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+
+import password_core
+from password_policy import PolicyError, load_policy
+from scoring_resources import SharedResources, prepare_for_fork
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+MAX_BATCH_SIZE = 10_000
+MAX_GENERATE_COUNT = 10_000
+KEEP_ALIVE_TIMEOUT = 30
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    """An error that is reported to the client as a JSON error response"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def public_result(result):
+    """Strips internal fields from a scoring result before it is sent"""
+    return {
+        "score": result["score"],
+        "max_score": result["max_score"],
+        "strength": result["strength"],
+        "feedback": result["feedback"],
+        "criteria": result.get("criteria", {}),
+    }
+
+
+class PasswordService:
+    """Request handling for the scoring service, one task per connection"""
+
+    def __init__(self, policy_file=None):
+        self.policy_file = policy_file
+        self.policy = load_policy(policy_file)
+
+    def refresh_policy(self):
+        """Picks up policy file changes; load_policy only re-reads on mtime change"""
+        try:
+            self.policy = load_policy(self.policy_file)
+        except (OSError, PolicyError):
+            pass  # Keep serving the last good policy
+
+    async def handle_connection(self, reader, writer):
+        """Serves requests on one keep-alive connection until it closes"""
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request_head(reader), KEEP_ALIVE_TIMEOUT)
+                    if request is None:
+                        break
+                    method, path, headers = request
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                    if path == "/v1/score/stream":
+                        keep_alive = await self.score_stream(method, headers, reader, writer) and keep_alive
+                    else:
+                        body = await read_body(reader, headers)
+                        status, payload = self.dispatch(method, path, body)
+                        write_json(writer, status, payload, keep_alive)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+                    break
+                except HTTPError as error:
+                    # The request body may not have been consumed, so the
+                    # connection cannot be reused safely
+                    keep_alive = False
+                    write_json(writer, error.status, {"error": error.message}, keep_alive)
+                except (ValueError, asyncio.LimitOverrunError):
+                    keep_alive = False
+                    write_json(writer, 400, {"error": "Malformed request"}, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def dispatch(self, method, path, body):
+        """Routes a buffered request; returns (status, payload)"""
+        if path == "/healthz":
+            if method != "GET":
+                raise HTTPError(405, "Use GET")
+            return 200, {"status": "ok", "policy": self.policy.key}
+
+        if path not in ("/v1/score", "/v1/generate"):
+            raise HTTPError(404, f"Unknown path {path}")
+        if method != "POST":
+            raise HTTPError(405, "Use POST")
+        try:
+            document = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Body must be JSON") from None
+        if not isinstance(document, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+
+        self.refresh_policy()
+        if path == "/v1/score":
+            passwords = document.get("passwords")
+            if not isinstance(passwords, list) or not all(isinstance(p, str) for p in passwords):
+                raise HTTPError(400, "'passwords' must be a list of strings")
+            if len(passwords) > MAX_BATCH_SIZE:
+                raise HTTPError(413, f"At most {MAX_BATCH_SIZE} passwords per request")
+            results = password_core.check_passwords(passwords, self.policy)
+            return 200, {"policy": self.policy.key, "results": [public_result(r) for r in results]}
+
+        count = document.get("count", 1)
+        length = document.get("length", 12)
+        if not isinstance(count, int) or not isinstance(length, int) or count < 1 or length < 1:
+            raise HTTPError(400, "'count' and 'length' must be positive integers")
+        if count > MAX_GENERATE_COUNT or length > 1024:
+            raise HTTPError(413, f"At most {MAX_GENERATE_COUNT} passwords of up to 1024 characters")
+        try:
+            passwords = password_core.generate_strong_passwords(count, length, self.policy)
+        except PolicyError as error:
+            raise HTTPError(422, str(error)) from None
+        return 200, {"policy": self.policy.key, "passwords": passwords}
+
+    async def score_stream(self, method, headers, reader, writer):
+        """
+        Streams results back while the request body is still arriving: each
+        input line (a JSON string or {"password": ...}) yields one output line.
+        Returns whether the connection can be reused afterwards.
+        """
+        if method != "POST":
+            raise HTTPError(405, "Use POST")
+        self.refresh_policy()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: application/x-ndjson\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n"
+        )
+        reusable = True
+        try:
+            async for line in iter_body_lines(reader, headers):
+                if not line.strip():
+                    continue
+                try:
+                    item = json.loads(line)
+                    password = item["password"] if isinstance(item, dict) else item
+                    if not isinstance(password, str):
+                        raise ValueError
+                    result = public_result(password_core.check_password_strength(password, self.policy))
+                except (ValueError, KeyError):
+                    result = {"error": "Each line must be a JSON string or {\"password\": ...}"}
+                write_chunk(writer, json.dumps(result).encode() + b"\n")
+                await writer.drain()
+        except HTTPError as error:
+            # The status line is already sent; report the error in-band
+            write_chunk(writer, json.dumps({"error": error.message}).encode() + b"\n")
+            reusable = False
+        writer.write(b"0\r\n\r\n")
+        return reusable
+
+
+async def read_request_head(reader):
+    """Reads a request line and headers; returns None on a clean EOF"""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as error:
+        if not error.partial:
+            return None
+        raise
+    except asyncio.LimitOverrunError:
+        raise HTTPError(413, "Request headers too large") from None
+    except ValueError:
+        # StreamReader reports an over-long separator search as ValueError
+        raise HTTPError(413, "Request headers too large") from None
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line") from None
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    return method.upper(), target.split("?", 1)[0], headers
+
+
+async def read_body(reader, headers):
+    """Reads a whole request body, honoring Content-Length or chunked encoding"""
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        size = 0
+        async for chunk in iter_chunks(reader):
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                raise HTTPError(413, "Request body too large")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    length = int(headers.get("content-length", "0") or 0)
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "Request body too large")
+    return await reader.readexactly(length) if length else b""
+
+
+async def iter_chunks(reader):
+    """Yields the chunks of a chunked request body"""
+    while True:
+        size_line = await reader.readuntil(b"\r\n")
+        try:
+            size = int(size_line.split(b";", 1)[0].strip(), 16)
+        except ValueError:
+            raise HTTPError(400, "Malformed chunk size") from None
+        if size == 0:
+            # Skip optional trailers
+            while (await reader.readuntil(b"\r\n")) != b"\r\n":
+                pass
+            return
+        chunk = await reader.readexactly(size + 2)
+        yield chunk[:-2]
+
+
+async def iter_body_lines(reader, headers):
+    """Yields complete lines of a request body as they arrive"""
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        pending = b""
+        async for chunk in iter_chunks(reader):
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                yield line
+        if pending:
+            yield pending
+        return
+
+    remaining = int(headers.get("content-length", "0") or 0)
+    if remaining > MAX_BODY_BYTES:
+        raise HTTPError(413, "Request body too large")
+    pending = b""
+    while remaining > 0:
+        # Never read past this body: the next pipelined request may follow it
+        data = await reader.read(min(remaining, 64 * 1024))
+        if not data:
+            raise asyncio.IncompleteReadError(pending, remaining)
+        remaining -= len(data)
+        pending += data
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+
+def write_chunk(writer, data):
+    """Writes one chunk of a chunked response"""
+    writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+
+def write_json(writer, status, payload, keep_alive):
+    """Writes a complete JSON response"""
+    body = json.dumps(payload).encode()
+    writer.write(
+        f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+        + body
+    )
+
+
+async def serve(host, port, policy_file=None, sock=None):
+    """Runs the service until cancelled, on `sock` if one is given"""
+    service = PasswordService(policy_file)
+    if sock is None:
+        server = await asyncio.start_server(service.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+    else:
+        server = await asyncio.start_server(service.handle_connection, sock=sock, limit=MAX_HEADER_BYTES)
+    addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+    print(f"Password scoring service on {addresses} (policy {service.policy.key}, pid {os.getpid()})")
+    async with server:
+        await server.serve_forever()
+
+
+def run_workers(host, port, policy_file, workers):
+    """
+    Loads the shared resources, then forks `workers` processes that accept
+    on one listening socket; returns when every worker has exited
+    """
+    resources = SharedResources(policy_file)
+    for line in resources.report_lines():
+        print(f"  {line}")
+    listener = socket.create_server((host, port), backlog=1024)
+    prepare_for_fork()
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                asyncio.run(serve(host, port, policy_file, listener))
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    listener.close()
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Password strength scoring service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--policy", help="policy file (default: $PASSWORD_POLICY_FILE or the bundled policy)")
+    parser.add_argument("--workers", type=int, default=1, help="pre-forked worker processes (POSIX only)")
+    args = parser.parse_args()
+    if args.workers > 1:
+        if not hasattr(os, "fork"):
+            parser.error("--workers needs a platform with os.fork")
+        run_workers(args.host, args.port, args.policy, args.workers)
+        return
+    try:
+        asyncio.run(serve(args.host, args.port, args.policy))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,16 @@
 import streamlit as st
-import re
-import random
-import string
+import math
+import statistics
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+import kdf_advisor
+import password_core
+from incremental_scorer import IncrementalScorer
+from passphrase import generate_passphrase
+from password_policy import PolicyError, get_policy, load_policy
+from scoring_resources import SharedResources
+from strength_panel import get_panel_templates
 
 # Set page configuration
 st.set_page_config(
@@ -101,6 +109,29 @@ st.markdown("""
         font-weight: 600;
     }
     
+    /* Result panel: criteria in two columns and feedback boxes */
+    .criteria-grid {
+        display: grid;
+        grid-template-columns: repeat(2, minmax(0, 1fr));
+        column-gap: 1rem;
+    }
+    
+    .feedback-warning, .feedback-success {
+        border-radius: 0.5rem;
+        padding: 0.75rem 1rem;
+        margin-bottom: 0.5rem;
+    }
+    
+    .feedback-warning {
+        background-color: rgba(255, 189, 69, 0.2);
+        color: #926C05;
+    }
+    
+    .feedback-success {
+        background-color: rgba(33, 195, 84, 0.2);
+        color: #177233;
+    }
+    
     /* Improve mobile responsiveness */
     @media (max-width: 768px) {
         .custom-header {
@@ -120,6 +151,10 @@ st.markdown("""
             font-size: 16px !important;
         }
         
+        .criteria-grid {
+            grid-template-columns: 1fr;
+        }
+        
         /* Make buttons more tappable on mobile */
         .stButton > button {
             height: 3rem;
@@ -128,115 +163,111 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_shared_resources():
+    """
+    Scoring data loaded once per server process and shared read-only by
+    every session (category table, policy, panels, wordlist)
+    """
+    return SharedResources()
+
+SHARED_RESOURCES = get_shared_resources()
+
+# Active policy; load_policy only re-reads the policy file when it changes
+ACTIVE_POLICY = load_policy()
+PANEL_TEMPLATES = get_panel_templates(ACTIVE_POLICY)
+
 # Optimized password strength checking function
 @st.cache_data
-def check_password_strength(password):
+def check_password_strength(password, policy_key):
     """
-    Analyzes password strength based on multiple criteria
+    Analyzes password strength against the active policy
     Returns a score and feedback
     """
-    if not password:
-        return {"score": 0, "strength": "None", "feedback": ["Enter a password"]}
-    
-    score = 0
-    feedback = []
-    criteria_met = {}
-    
-    # Check length
-    criteria_met["length"] = len(password) >= 8
-    if criteria_met["length"]:
-        score += 1
-    else:
-        feedback.append("Password should be at least 8 characters long")
-    
-    # Check for uppercase letters
-    criteria_met["uppercase"] = bool(re.search(r'[A-Z]', password))
-    if criteria_met["uppercase"]:
-        score += 1
-    else:
-        feedback.append("Add uppercase letters")
-    
-    # Check for lowercase letters
-    criteria_met["lowercase"] = bool(re.search(r'[a-z]', password))
-    if criteria_met["lowercase"]:
-        score += 1
-    else:
-        feedback.append("Add lowercase letters")
-    
-    # Check for digits
-    criteria_met["digits"] = bool(re.search(r'\d', password))
-    if criteria_met["digits"]:
-        score += 1
-    else:
-        feedback.append("Add at least one number")
-    
-    # Check for special characters
-    criteria_met["special"] = bool(re.search(r'[!@#$%^&*]', password))
-    if criteria_met["special"]:
-        score += 1
-    else:
-        feedback.append("Add special characters (!@#$%^&*)")
-    
-    # Check for common passwords - more efficient with a set
-    common_passwords = {
-        "password", "123456", "qwerty", "admin", "welcome", 
-        "password123", "abc123", "letmein", "monkey", "1234567890"
-    }
-    
-    if password.lower() in common_passwords:
-        score = 1  # Force a weak score
-        feedback.append("This is a commonly used password and easily guessable")
-    
-    # Determine strength category
-    if score <= 2:
-        strength = "Weak"
-    elif score <= 4:
-        strength = "Moderate"
-    else:
-        strength = "Strong"
-        
-    return {
-        "score": score,
-        "strength": strength,
-        "feedback": feedback,
-        "criteria": criteria_met
-    }
+    return password_core.check_password_strength(password, get_policy(policy_key))
 
-# Optimized password generator
-def generate_strong_password(length=12):
+def get_incremental_scorer():
     """
-    Generates a strong password of specified length
-    Ensures it contains all required character types
+    Returns this session's keystroke scorer, which only scans the characters
+    typed since the previous rerun; rebuilt when the active policy changes
     """
-    if length < 8:
-        length = 8  # Minimum secure length [^1]
-    
-    # Pre-select required characters
-    required_chars = [
-        random.choice(string.ascii_lowercase),
-        random.choice(string.ascii_uppercase),
-        random.choice(string.digits),
-        random.choice("!@#$%^&*")
-    ]
-    
-    # Fill the rest with random characters
-    all_chars = string.ascii_letters + string.digits + "!@#$%^&*"
-    remaining_chars = [random.choice(all_chars) for _ in range(length - 4)]
+    scorer = st.session_state.get("incremental_scorer")
+    if scorer is None or scorer.policy is not ACTIVE_POLICY:
+        scorer = IncrementalScorer(ACTIVE_POLICY)
+        st.session_state.incremental_scorer = scorer
+    return scorer
+
+def apply_requested_breach_check(result, password, breach_checker):
+    """
+    Runs the breach lookup only when the user asks for it, since every typed
+    prefix falls in a different hash range and would cost a round trip per
+    keystroke. The count is kept until the password changes
+    """
+    checked = st.session_state.get("breach_checked")
+    if checked is not None and checked[0] == password:
+        password_core.apply_breach_count(result, checked[1], ACTIVE_POLICY)
+    elif st.button("Check known breaches", help="Looks up the password's hash range, never the password itself"):
+        password_core.apply_breach_check(result, password, ACTIVE_POLICY, breach_checker)
+        if result["breach_count"] is not None:  # Unreachable servers can be retried
+            st.session_state.breach_checked = (password, result["breach_count"])
+
+# Passwords are generated ahead of time in small batches on a background
+# thread, so a button click only pops an already generated password
+GENERATION_BATCH_SIZE = 16
+LATENCY_HISTORY_SIZE = 50
+
+@st.cache_resource
+def get_generation_executor():
+    """Shared worker that refills the per-session password buffers"""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="password-generator")
+
+def prefetch_generated_passwords(length):
+    """
+    Schedules a background refill of the session's buffer for `length`
+    when it is running low and no refill is already in flight
+    """
+    buffers = st.session_state.setdefault("password_buffers", {})
+    refills = st.session_state.setdefault("password_refills", {})
+    buffer = buffers.setdefault(length, [])
     
-    # Combine and shuffle
-    password_chars = required_chars + remaining_chars
-    random.shuffle(password_chars)
+    refill = refills.get(length)
+    if refill is not None and refill.done():
+        del refills[length]
+        if refill.exception() is not None:
+            return  # The policy cannot be met at this length; generating inline reports why
+        buffer.extend(refill.result())
+        refill = None
     
-    return ''.join(password_chars)
+    if refill is None and len(buffer) < GENERATION_BATCH_SIZE // 4:
+        refills[length] = get_generation_executor().submit(
+            password_core.generate_strong_passwords, GENERATION_BATCH_SIZE, length, ACTIVE_POLICY
+        )
 
-# Helper function to display strength with appropriate styling
-def display_strength_indicator(strength, score):
-    if strength == "Weak":
-        st.markdown(f"<p class='strength-weak'>⚠️ {strength} ({score}/5)</p>", unsafe_allow_html=True)
-    elif strength == "Moderate":
-        st.markdown(f"<p class='strength-moderate'>⚠️ {strength} ({score}/5)</p>", unsafe_allow_html=True)
-    else:
-        st.markdown(f"<p class='strength-strong'>✅ {strength} ({score}/5)</p>", unsafe_allow_html=True)
+def take_generated_password(length):
+    """
+    Returns a pre-generated password of `length`, falling back to
+    generating one inline when the buffer has not been filled yet
+    """
+    prefetch_generated_passwords(length)
+    buffer = st.session_state.password_buffers[length]
+    password = buffer.pop() if buffer else password_core.generate_strong_password(length, ACTIVE_POLICY)
+    prefetch_generated_passwords(length)
+    return password
+
+def record_generation_latency(started):
+    """Stores the latency of a generate click (in ms) in session state"""
+    latencies = st.session_state.setdefault("generation_latencies_ms", [])
+    latencies.append((time.perf_counter() - started) * 1000)
+    del latencies[:-LATENCY_HISTORY_SIZE]
+
+@st.cache_resource
+def get_kdf_benchmark():
+    """
+    Hash throughput measurements for this host, computed once per process
+    on a background thread (and read from the per-host cache when present)
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kdf-benchmark")
+    return executor.submit(kdf_advisor.get_benchmarks)
 
 # Helper function to create a card container
 def create_card(content_function):
@@ -248,7 +279,7 @@ def create_card(content_function):
 st.markdown('<h1 class="custom-header">🔒 Password Strength Meter</h1>', unsafe_allow_html=True)
 
 # Create tabs with better styling
-tab1, tab2 = st.tabs(["📊 Check Password", "🔑 Generate Password"])
+tab1, tab2, tab3 = st.tabs(["📊 Check Password", "🔑 Generate Password", "⏱️ Hashing Cost"])
 
 with tab1:
     def check_password_content():
@@ -266,61 +297,15 @@ with tab1:
         
         # Only analyze if there's a password
         if password:
-            result = check_password_strength(password)
-            
-            # Display score with color-coded progress bar
-            st.markdown('<h3 class="custom-subheader">Password Strength</h3>', unsafe_allow_html=True)
-            score_percentage = (result["score"] / 5) * 100
-            
-            # Display strength indicator
-            display_strength_indicator(result["strength"], result["score"])
-            
-            # Color-coded progress bar
-            if result["strength"] == "Weak":
-                bar_color = "rgba(220, 38, 38, 0.8)"  # Red with transparency
-            elif result["strength"] == "Moderate":
-                bar_color = "rgba(217, 119, 6, 0.8)"  # Orange with transparency
-            else:
-                bar_color = "rgba(5, 150, 105, 0.8)"  # Green with transparency
-                
-            # Custom progress bar with better styling
-            st.markdown(
-                f"""
-                <div style="width:100%; background-color:#f0f0f0; border-radius:10px; height:20px; margin-bottom:20px;">
-                    <div style="width:{score_percentage}%; background-color:{bar_color}; height:20px; border-radius:10px; 
-                    transition: width 0.5s ease-in-out;"></div>
-                </div>
-                """, 
-                unsafe_allow_html=True
-            )
-            
-            # Display criteria status in a more attractive way
-            st.markdown('<h3 class="custom-subheader">Security Criteria</h3>', unsafe_allow_html=True)
-            
-            criteria_cols = st.columns(2)
+            result = get_incremental_scorer().score(password)
             
-            criteria_list = [
-                ("Length (8+ characters)", result["criteria"].get("length", False)),
-                ("Uppercase letters", result["criteria"].get("uppercase", False)),
-                ("Lowercase letters", result["criteria"].get("lowercase", False)),
-                ("Numbers", result["criteria"].get("digits", False)),
-                ("Special characters", result["criteria"].get("special", False))
-            ]
+            # Optional k-anonymity breach lookup (PASSWORD_BREACH_RANGE_URL)
+            breach_checker = SHARED_RESOURCES.breach_checker
+            if breach_checker is not None:
+                apply_requested_breach_check(result, password, breach_checker)
             
-            for i, (criterion, met) in enumerate(criteria_list):
-                with criteria_cols[i % 2]:
-                    if met:
-                        st.markdown(f"<p>✅ {criterion}</p>", unsafe_allow_html=True)
-                    else:
-                        st.markdown(f"<p>❌ {criterion}</p>", unsafe_allow_html=True)
-            
-            # Display feedback
-            if result["feedback"]:
-                st.markdown('<h3 class="custom-subheader">Improvement Suggestions</h3>', unsafe_allow_html=True)
-                for suggestion in result["feedback"]:
-                    st.warning(suggestion)
-            else:
-                st.success("Excellent! Your password meets all security criteria.")
+            # Whole result panel as one pre-rendered markdown element
+            st.markdown(PANEL_TEMPLATES.for_result(result), unsafe_allow_html=True)
     
     create_card(check_password_content)
 
@@ -328,27 +313,55 @@ with tab2:
     def generate_password_content():
         st.markdown('<h2 class="custom-subheader">Generate a Strong Password</h2>', unsafe_allow_html=True)
         
-        # Password length slider with better styling
-        length = st.slider(
-            "Password Length", 
-            min_value=8, 
-            max_value=30, 
-            value=12, 
-            help="For security reasons, minimum length is 8 characters [^1]"
-        )
+        mode = st.radio("Generate a", ["Password", "Passphrase"], horizontal=True)
+        
+        if mode == "Password":
+            # Password length slider with better styling
+            length = st.slider(
+                "Password Length", 
+                min_value=ACTIVE_POLICY.min_length, 
+                max_value=max(30, ACTIVE_POLICY.min_length + 8), 
+                value=max(12, ACTIVE_POLICY.min_length), 
+                help=f"For security reasons, minimum length is {ACTIVE_POLICY.min_length} characters [^1]"
+            )
+        else:
+            word_count = st.slider(
+                "Number of Words",
+                min_value=4,
+                max_value=10,
+                value=6,
+                help="Each word is picked uniformly from the wordlist; more words means more entropy"
+            )
+            separator = st.selectbox(
+                "Separator",
+                ["-", " ", ".", "_"],
+                format_func=lambda value: "space" if value == " " else value
+            )
         
         # Generate button with better styling
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
-            if st.button("Generate Secure Password", use_container_width=True):
-                with st.spinner("Generating secure password..."):
-                    # Add a small delay for effect
-                    time.sleep(0.3)
-                    generated_password = generate_strong_password(length)
-                    
-                    # Store in session state to persist between reruns
-                    st.session_state.generated_password = generated_password
-                    st.session_state.show_generated = True
+            if st.button(f"Generate Secure {mode}", use_container_width=True):
+                started = time.perf_counter()
+                if mode == "Password":
+                    try:
+                        generated_password = take_generated_password(length)
+                    except PolicyError as error:
+                        st.error(str(error))
+                        return
+                    st.session_state.generated_entropy = None
+                else:
+                    passphrase = generate_passphrase(word_count, separator, SHARED_RESOURCES.wordlist)
+                    generated_password = passphrase.text
+                    st.session_state.generated_entropy = passphrase.entropy_bits
+                
+                # Store in session state to persist between reruns
+                st.session_state.generated_password = generated_password
+                st.session_state.show_generated = True
+                record_generation_latency(started)
+            elif mode == "Password":
+                # Warm the buffer for the selected length before the first click
+                prefetch_generated_passwords(length)
         
         # Display generated password
         if 'show_generated' in st.session_state and st.session_state.show_generated:
@@ -364,35 +377,75 @@ with tab2:
             else:
                 st.code("•" * len(st.session_state.generated_password), language="")
             
+            # Per-click generation latency, measured from click to stored result
+            latencies = st.session_state.get("generation_latencies_ms")
+            if latencies:
+                st.caption(
+                    f"Generated in {latencies[-1]:.2f} ms "
+                    f"(median {statistics.median(latencies):.2f} ms over the last {len(latencies)} clicks)"
+                )
+            
             # Copy button with better styling
             col1, col2, col3 = st.columns([1, 2, 1])
             with col2:
                 if st.button("Copy to Clipboard", use_container_width=True):
                     st.success(f"Password copied to clipboard!")
                     
-            # Show strength of generated password
-            result = check_password_strength(st.session_state.generated_password)
-            
-            st.markdown('<h3 class="custom-subheader">Password Strength</h3>', unsafe_allow_html=True)
-            display_strength_indicator(result["strength"], result["score"])
-            
-            # Display criteria status for generated password
-            criteria_cols = st.columns(2)
-            
-            criteria_list = [
-                ("Length (8+ characters)", result["criteria"].get("length", False)),
-                ("Uppercase letters", result["criteria"].get("uppercase", False)),
-                ("Lowercase letters", result["criteria"].get("lowercase", False)),
-                ("Numbers", result["criteria"].get("digits", False)),
-                ("Special characters", result["criteria"].get("special", False))
-            ]
-            
-            for i, (criterion, met) in enumerate(criteria_list):
-                with criteria_cols[i % 2]:
-                    st.markdown(f"<p>✅ {criterion}</p>", unsafe_allow_html=True)
+            # Passphrases are rated by entropy, since they intentionally skip
+            # the character-class criteria
+            entropy = st.session_state.get("generated_entropy")
+            if entropy:
+                st.markdown('<h3 class="custom-subheader">Passphrase Strength</h3>', unsafe_allow_html=True)
+                st.markdown(
+                    f"<p class='strength-strong'>✅ {entropy:.1f} bits of entropy "
+                    f"({len(SHARED_RESOURCES.wordlist)} word list)</p>",
+                    unsafe_allow_html=True
+                )
+            else:
+                # Show strength of generated password
+                result = check_password_strength(st.session_state.generated_password, ACTIVE_POLICY.cache_key)
+                
+                st.markdown(PANEL_TEMPLATES.for_result(result), unsafe_allow_html=True)
     
     create_card(generate_password_content)
 
+with tab3:
+    def hashing_cost_content():
+        st.markdown('<h2 class="custom-subheader">Hashing Cost Advisor</h2>', unsafe_allow_html=True)
+        st.markdown(
+            "How long an attacker with this server's hardware (one core) would need to crack a "
+            "password, for each password hashing configuration."
+        )
+        
+        password = st.text_input("Password to evaluate", type="password", key="kdf_password")
+        
+        benchmark = get_kdf_benchmark()
+        if not benchmark.done():
+            st.info("Benchmarking hash functions on this machine, this takes a few seconds...")
+            st.button("Refresh results")
+            return
+        benchmarks = benchmark.result()
+        
+        if password:
+            result = check_password_strength(password, ACTIVE_POLICY.cache_key)
+            guesses = password_core.estimate_guesses(password, result, ACTIVE_POLICY)
+            # From the bit length: str() of an int over 4300 digits raises ValueError
+            st.caption(f"Estimated guesses needed: about 10^{int(guesses.bit_length() * math.log10(2))}")
+            rows = kdf_advisor.crack_time_table(guesses, benchmarks["rates"])
+            st.table([
+                {"Configuration": label, "Hashes per second": f"{rate:,.1f}", "Expected crack time": crack_time}
+                for label, rate, crack_time in rows
+            ])
+        
+        missing = [label for label, rate in benchmarks["rates"].items() if not rate]
+        measured_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(benchmarks["measured_at"]))
+        st.caption(
+            f"Measured on {benchmarks['host']} at {measured_at}."
+            + (f" Not measured (install bcrypt / argon2-cffi): {', '.join(missing)}." if missing else "")
+        )
+    
+    create_card(hashing_cost_content)
+
 # Security information in an attractive expandable card
 def security_info_content():
     st.markdown("""
@@ -417,6 +470,11 @@ def security_info_content():
 with st.expander("📚 Password Security Information"):
     create_card(security_info_content)
 
+# Startup cost and memory of the shared data, for sizing server instances
+with st.sidebar:
+    st.markdown("**Server resources**")
+    st.caption("  \n".join(SHARED_RESOURCES.report_lines()))
+
 # Footer with better styling
 st.markdown("""
 <div style="text-align: center; margin-top: 2rem; padding: 1rem; background-color: #F3F4F6; border-radius: 10px;">
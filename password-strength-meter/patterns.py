@@ -0,0 +1,167 @@
+"""
+Keyboard-walk and sequence detection
+
+Keyboard walks ("qwerty", "zxcvb", "7894") and character sequences
+("abcd", "4321") are found in a single pass over the password's bytes.
+Everything about a pair of neighbouring characters is precomputed into one
+128 x 128 table of bit flags: bit i is set when the two keys are adjacent
+on layout i, and two more bits mark ascending and descending sequences. A
+scan is then one table index and two integer operations per character,
+with no dict lookups and nothing allocated per character.
+
+The pair table works on ASCII bytes; other characters are mapped to a
+sentinel byte that is adjacent to nothing, which breaks any run.
+"""
+from collections import namedtuple
+
+# Rows as (unshifted keys, shifted keys, horizontal offset of the row);
+# layouts with "reach" 1 count diagonal neighbours on a square grid.
+# Non-ASCII keys are kept so the columns line up; the pair table skips them
+LAYOUTS = (
+    ("qwerty", 0.99, (
+        ("`1234567890-=", "~!@#$%^&*()_+", 0.0),
+        ("qwertyuiop[]\\", "QWERTYUIOP{}|", 0.5),
+        ("asdfghjkl;'", "ASDFGHJKL:\"", 0.75),
+        ("zxcvbnm,./", "ZXCVBNM<>?", 1.25),
+    )),
+    ("azerty", 0.99, (
+        ("&é\"'(-è_çà)=", "1234567890°+", 1.0),
+        ("azertyuiop^$", "AZERTYUIOP", 0.5),
+        ("qsdfghjklmù*", "QSDFGHJKLM%µ", 0.75),
+        ("<wxcvbn,;:!", ">WXCVBN?./", 0.25),
+    )),
+    ("dvorak", 0.99, (
+        ("`1234567890[]", "~!@#$%^&*(){}", 0.0),
+        ("',.pyfgcrl/=\\", "\"<>PYFGCRL?+|", 0.5),
+        ("aoeuidhtns-", "AOEUIDHTNS_", 0.75),
+        (";qjkxbmwvz", ":QJKXBMWVZ", 1.25),
+    )),
+    ("keypad", 1.0, (
+        (" /*-", "", 0.0),
+        ("789+", "", 0.0),
+        ("456", "", 0.0),
+        ("123", "", 0.0),
+        ("0.", "", 0.0),
+    )),
+)
+LAYOUT_NAMES = tuple(name for name, _, _ in LAYOUTS)
+WALK_BITS = (1 << len(LAYOUTS)) - 1
+ASCENDING = 1 << len(LAYOUTS)
+DESCENDING = ASCENDING << 1
+
+Match = namedtuple("Match", ["kind", "token", "start", "end"])
+
+
+def _key_positions(rows):
+    """Maps every character of a layout to the (x, y) of its key"""
+    positions = {}
+    for y, (keys, shifted, offset) in enumerate(rows):
+        for x, char in enumerate(keys):
+            if char != " ":
+                positions[char] = (x + offset, y)
+        for x, char in enumerate(shifted):
+            positions.setdefault(char, (x + offset, y))
+    return positions
+
+
+def _build_pair_table():
+    table = bytearray(128 * 128)
+    for bit, (_, reach, rows) in enumerate(LAYOUTS):
+        positions = _key_positions(rows)
+        for first, (x1, y1) in positions.items():
+            for second, (x2, y2) in positions.items():
+                if ord(first) > 127 or ord(second) > 127:
+                    continue
+                dx, dy = abs(x1 - x2), abs(y1 - y2)
+                if (dy == 0 and dx == 1) or (dy == 1 and dx <= reach):
+                    table[ord(first) << 7 | ord(second)] |= 1 << bit
+
+    # Sequences ignore case, so "aBcD" counts as well
+    letters = [(lower, lower.upper()) for lower in "abcdefghijklmnopqrstuvwxyz"]
+    digits = [(digit,) for digit in "0123456789"]
+    for alphabet in (letters, digits):
+        for firsts, seconds in zip(alphabet, alphabet[1:]):
+            for first in firsts:
+                for second in seconds:
+                    table[ord(first) << 7 | ord(second)] |= ASCENDING
+                    table[ord(second) << 7 | ord(first)] |= DESCENDING
+    return bytes(table)
+
+
+PAIR_TABLE = _build_pair_table()
+# Printable ASCII bytes map to themselves, everything else to 0
+ASCII_BYTES = bytes(byte if 0x20 <= byte < 0x7f else 0 for byte in range(256))
+
+
+def to_scan_bytes(text):
+    """The bytes a scan walks over: printable ASCII kept, the rest zeroed"""
+    return text.encode("utf-8", "surrogatepass").translate(ASCII_BYTES)
+
+
+def scan_runs(data, previous=0, active=0, run=0, longest=0):
+    """
+    Continues a scan over `data` (see to_scan_bytes) from the carried state
+    Returns (previous byte, active pair bits, current run length, longest run)
+    """
+    pairs = PAIR_TABLE
+    for current in data:
+        pair = pairs[previous << 7 | current]
+        if active & pair:
+            # The run continues on the layouts/directions it already used
+            active &= pair
+            run += 1
+        else:
+            active = pair
+            run = 2 if pair else 1
+        if run > longest:
+            longest = run
+        previous = current
+    return previous, active, run, longest
+
+
+def longest_run(text):
+    """Length of the longest keyboard walk or sequence in `text`"""
+    return scan_runs(to_scan_bytes(text))[3]
+
+
+def _kind(bits):
+    if not bits & WALK_BITS or bits & (ASCENDING | DESCENDING):
+        return "sequence"
+    index = (bits & -bits).bit_length() - 1
+    return f"{LAYOUT_NAMES[index]} keyboard walk"
+
+
+def find_patterns(text, min_length=3):
+    """
+    Returns every keyboard walk or sequence of at least `min_length`
+    characters in `text` as Match(kind, token, start, end). Matches never
+    overlap: a run that starts inside the previous match is cut to begin
+    where that match ends.
+
+    Offsets are into the UTF-8 encoding, which equals the character offset
+    for ASCII text; tokens are always exact.
+    """
+    encoded = text.encode("utf-8", "surrogatepass")
+    data = encoded.translate(ASCII_BYTES)
+    pairs = PAIR_TABLE
+    matches = []
+    previous = active = run = taken = 0
+    for index, current in enumerate(data):
+        pair = pairs[previous << 7 | current]
+        if active & pair:
+            active &= pair
+            run += 1
+        else:
+            # A new run starts on the previous character, which may end the last match
+            start = max(index - run, taken)
+            if index - start >= min_length:
+                matches.append(Match(_kind(active), encoded[start:index].decode(), start, index))
+                taken = index
+            active = pair
+            run = 2 if pair else 1
+        previous = current
+    end = len(data)
+    start = max(end - run, taken)
+    if end - start >= min_length:
+        matches.append(Match(_kind(active), encoded[start:end].decode(), start, end))
+    return matches
@@ -0,0 +1,76 @@
+"""
+Local stand-in for a Pwned Passwords style range server
+
+Serves GET /range/<5 hex chars> from a plaintext file of "password" or
+"password:count" lines, so breach checking can be developed and tested
+without sending anything off the machine.
+
+    python range_stub_server.py breached.txt --port 8766
+    PASSWORD_BREACH_RANGE_URL=http://127.0.0.1:8766/range/ streamlit run password_strength_app.py
+"""
+import argparse
+import hashlib
+import re
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX_PATTERN = re.compile(r"^/range/([0-9A-Fa-f]{5})$")
+
+
+def load_ranges(lines):
+    """Groups "SUFFIX:COUNT" lines by SHA-1 prefix"""
+    ranges = defaultdict(list)
+    for line in lines:
+        line = line.rstrip("\n")
+        if not line:
+            continue
+        password, separator, count = line.rpartition(":")
+        if not separator or not count.isdigit():
+            password, count = line, "1"
+        digest = hashlib.sha1(password.encode("utf-8")).hexdigest().upper()
+        ranges[digest[:5]].append(f"{digest[5:]}:{count}")
+    return {prefix: "\r\n".join(sorted(entries)).encode("ascii") for prefix, entries in ranges.items()}
+
+
+def make_handler(ranges):
+    class RangeHandler(BaseHTTPRequestHandler):
+        # HTTP/1.1 keeps connections alive, like the real API
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            match = PREFIX_PATTERN.match(self.path)
+            if not match:
+                self.send_error(404)
+                return
+            body = ranges.get(match.group(1).upper(), b"")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Request lines contain hash prefixes only, but keep output quiet
+
+    return RangeHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local k-anonymity range server stub")
+    parser.add_argument("passwords", help="file with one password (or password:count) per line")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    with open(args.passwords, encoding="utf-8") as file:
+        ranges = load_ranges(file)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(ranges))
+    print(f"Serving {len(ranges)} ranges on http://{args.host}:{args.port}/range/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
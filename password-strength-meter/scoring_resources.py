@@ -0,0 +1,98 @@
+"""
+Process-wide scoring data, loaded once and shared read-only
+
+Everything a check or generate request reads (the compiled policy, the
+Unicode category table, pre-rendered panels, the passphrase wordlist and
+the breach checker) is loaded here once per server process. The Streamlit
+app keeps the result in st.cache_resource so every session shares it, and
+the scoring service loads it before forking workers so they inherit the
+pages copy-on-write instead of each building their own copy.
+
+    python scoring_resources.py    # prints load timings and resident memory
+"""
+import gc
+import os
+import sys
+import time
+
+from breach_check import get_breach_checker
+from passphrase import get_default_wordlist
+from password_policy import load_policy
+from strength_panel import get_panel_templates
+from unicode_classes import get_category_table
+
+
+class SharedResources:
+    """Read-only scoring data plus how long each part took to load"""
+
+    def __init__(self, policy_file=None):
+        started = time.perf_counter()
+        rss_before = resident_memory_bytes()
+        self.load_seconds = {}
+
+        # The category table comes first because compiling a policy needs it
+        self.category_table = self._timed("unicode categories", get_category_table)
+        self.policy = self._timed("policy", load_policy, policy_file)
+        self.panel_templates = self._timed("result panels", get_panel_templates, self.policy)
+        self.wordlist = self._timed("passphrase wordlist", get_default_wordlist)
+        self.breach_checker = self._timed("breach checker", get_breach_checker)
+
+        self.total_seconds = time.perf_counter() - started
+        self.rss_bytes = resident_memory_bytes()
+        self.rss_growth_bytes = self.rss_bytes - rss_before if rss_before and self.rss_bytes else None
+
+    def _timed(self, name, loader, *args):
+        started = time.perf_counter()
+        value = loader(*args)
+        self.load_seconds[name] = time.perf_counter() - started
+        return value
+
+    def report_lines(self):
+        """Human readable load timings and memory, one line per entry"""
+        lines = [f"{name}: {seconds * 1000:.1f} ms" for name, seconds in self.load_seconds.items()]
+        lines.append(f"total: {self.total_seconds * 1000:.1f} ms")
+        if self.rss_bytes:
+            growth = ""
+            if self.rss_growth_bytes is not None:
+                growth = f" (+{self.rss_growth_bytes / 2**20:.1f} MiB while loading)"
+            lines.append(f"resident memory: {self.rss_bytes / 2**20:.1f} MiB{growth}")
+        return lines
+
+
+def resident_memory_bytes():
+    """Current resident set size of this process, or None if unavailable"""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Not available without /proc, so fall back to the peak (KiB on Linux, bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def prepare_for_fork():
+    """
+    Moves everything loaded so far out of the garbage collector's view
+
+    Collections touch the header of every tracked object, which would copy
+    the shared pages into each forked worker. Call after loading resources
+    and right before forking.
+    """
+    gc.collect()
+    gc.freeze()
+
+
+def main():
+    resources = SharedResources(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(f"Loaded shared resources for policy {resources.policy.key}")
+    for line in resources.report_lines():
+        print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Pre-rendered HTML for the password strength result panel
+
+A policy with N criteria can only produce (N + 1) scores and 2**N criteria
+bitmasks, so every possible panel is rendered once per policy and a
+keystroke only costs a dict lookup and a single st.markdown call.
+"""
+from html import escape
+
+from password_policy import BLOCKLIST_FEEDBACK
+
+BREACHED_FEEDBACK = "This password has appeared in known data breaches"
+
+# Strength category -> (css class, icon, progress bar color)
+STRENGTH_STYLES = {
+    "Weak": ("strength-weak", "⚠️", "rgba(220, 38, 38, 0.8)"),  # Red with transparency
+    "Moderate": ("strength-moderate", "⚠️", "rgba(217, 119, 6, 0.8)"),  # Orange with transparency
+    "Strong": ("strength-strong", "✅", "rgba(5, 150, 105, 0.8)"),  # Green with transparency
+}
+
+# Policies with more criteria than this render panels on first use instead of up front
+MAX_PRERENDERED_CRITERIA = 6
+
+
+def render_panel(policy, score, criteria_mask, blocklisted=False, breached=False):
+    """Renders the full result panel for one (score, criteria bitmask) combination"""
+    strength = policy.strength_for(score)
+    css_class, icon, bar_color = STRENGTH_STYLES[strength]
+    score_percentage = score / policy.max_score * 100
+
+    parts = [
+        '<h3 class="custom-subheader">Password Strength</h3>',
+        f"<p class='{css_class}'>{icon} {strength} ({score}/{policy.max_score})</p>",
+        '<div style="width:100%; background-color:#f0f0f0; border-radius:10px; height:20px; margin-bottom:20px;">'
+        f'<div style="width:{score_percentage}%; background-color:{bar_color}; height:20px; border-radius:10px; '
+        'transition: width 0.5s ease-in-out;"></div></div>',
+        '<h3 class="custom-subheader">Security Criteria</h3>',
+        '<div class="criteria-grid">',
+    ]
+
+    feedback = []
+    for index, (_, label, message) in enumerate(policy.criteria):
+        met = criteria_mask >> index & 1
+        parts.append(f"<p>{'✅' if met else '❌'} {escape(label)}</p>")
+        if not met:
+            feedback.append(message)
+    parts.append("</div>")
+    if blocklisted:
+        feedback.append(BLOCKLIST_FEEDBACK)
+    if breached:
+        feedback.append(BREACHED_FEEDBACK)
+
+    if feedback:
+        parts.append('<h3 class="custom-subheader">Improvement Suggestions</h3>')
+        parts.extend(f'<div class="feedback-warning">{escape(message)}</div>' for message in feedback)
+    else:
+        parts.append('<div class="feedback-success">Excellent! Your password meets all security criteria.</div>')
+
+    return "\n".join(parts)
+
+
+class PanelTemplates(dict):
+    """
+    Panel HTML keyed by (score, criteria bitmask, blocklisted, breached)
+
+    The blocklist and breach flags are part of the key because they add
+    suggestions the bitmask alone does not reveal.
+    """
+
+    def __init__(self, policy):
+        super().__init__()
+        self.policy = policy
+        if policy.max_score <= MAX_PRERENDERED_CRITERIA:
+            for score in range(policy.max_score + 1):
+                for criteria_mask in range(1 << policy.max_score):
+                    for blocklisted in (False, True):
+                        for breached in (False, True):
+                            self[score, criteria_mask, blocklisted, breached] = render_panel(
+                                policy, score, criteria_mask, blocklisted, breached
+                            )
+
+    def __missing__(self, key):
+        html = render_panel(self.policy, *key)
+        self[key] = html
+        return html
+
+    def for_result(self, result):
+        """Returns the panel for a check_password_strength result"""
+        return self[
+            result["score"],
+            result["criteria_mask"],
+            result["blocklisted"],
+            bool(result.get("breach_count")),
+        ]
+
+
+_templates_by_policy = {}
+
+
+def get_panel_templates(policy):
+    """Returns the pre-rendered panels for a policy, building them once per rule set"""
+    templates = _templates_by_policy.get(policy.cache_key)
+    if templates is None:
+        templates = PanelTemplates(policy)
+        _templates_by_policy[policy.cache_key] = templates
+    return templates
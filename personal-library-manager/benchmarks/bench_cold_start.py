@@ -0,0 +1,69 @@
+"""Cold-start time of one-shot CLI commands as the collection grows.
+
+Creates an SQLite collection of N books, then runs each command as a fresh
+`python cli.py ...` process, the way automation calls it, and reports the
+median wall-clock time. The "load all" row is a process that only builds
+the in-memory indexes, which is what every start cost before loading
+became lazy.
+
+    python benchmarks/bench_cold_start.py --sizes 1000 100000 1000000
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT)
+
+from bench_storage import generate_books  # noqa: E402
+from storage import SQLiteStorage  # noqa: E402
+
+COMMANDS = {
+    "add": ["add", "Cold Start", "Bench Author", "--year", "2024"],
+    "update": ["update", "Cold Start", "--read"],
+    "rm": ["rm", "Cold Start"],
+    "list": ["list", "--sort", "title", "--page", "50"],
+    "find": ["find", "book 4242"],
+    "stats": ["stats"],
+}
+
+
+def median_seconds(command, runs):
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=PROJECT, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI cold-start benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'books':>10}{'command':>10}{'ms':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            path = os.path.join(directory, f"books-{size}.db")
+            storage = SQLiteStorage(path)
+            storage.add_books(generate_books(size))
+            storage.close()
+            cli = [sys.executable, "cli.py", "--db", path]
+            for name, command in COMMANDS.items():
+                # add/update/rm run as a cycle so every run sees the same collection
+                runs = 1 if name in ("add", "update", "rm") else args.runs
+                seconds = median_seconds(cli + command, runs)
+                print(f"{size:>10}{name:>10}{seconds * 1000:>10.1f}")
+            load_all = [sys.executable, "-c", f"from main import BookCollection; BookCollection({path!r}).book_list"]
+            seconds = median_seconds(load_all, 1 if size > 100_000 else args.runs)
+            print(f"{size:>10}{'load all':>10}{seconds * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
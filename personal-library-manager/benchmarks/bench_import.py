@@ -0,0 +1,61 @@
+"""Bulk import and export throughput.
+
+Writes N generated books to a CSV file, imports it into an empty SQLite
+collection with BookCollection.import_file (batched transactions, indexes
+built per batch), exports it again as JSONL, and compares the import rate
+with adding the same books one add_book call at a time, which commits
+each book on its own as create_new_book does.
+
+    python benchmarks/bench_import.py --sizes 10000 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_storage import generate_books  # noqa: E402
+from bulk_io import write_records  # noqa: E402
+from main import BookCollection  # noqa: E402
+
+# Enough single adds to get a steady rate
+SINGLE_ADDS = 2_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import/export benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'books':>10}{'import s':>10}{'rows/s':>10}{'export s':>10}{'single add rows/s':>19}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            source = os.path.join(directory, f"books-{size}.csv")
+            write_records(generate_books(size), source, "csv")
+
+            collection = BookCollection(os.path.join(directory, f"import-{size}.db"))
+            started = time.perf_counter()
+            counts = collection.import_file(source)
+            import_seconds = time.perf_counter() - started
+            assert counts["added"] == size, counts
+
+            started = time.perf_counter()
+            collection.export_file(os.path.join(directory, f"export-{size}.jsonl"))
+            export_seconds = time.perf_counter() - started
+            collection.storage.close()
+
+            single = BookCollection(os.path.join(directory, f"single-{size}.db"))
+            started = time.perf_counter()
+            for book in generate_books(SINGLE_ADDS, seed=size):
+                single.add_book(**book)
+            single_rate = SINGLE_ADDS / (time.perf_counter() - started)
+            single.storage.close()
+
+            print(f"{size:>10}{import_seconds:>10.2f}{size / import_seconds:>10.0f}{export_seconds:>10.2f}"
+                  f"{single_rate:>19.0f}")
+
+
+if __name__ == "__main__":
+    main()
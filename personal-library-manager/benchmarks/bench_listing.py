@@ -0,0 +1,68 @@
+"""Cost of one page of a sorted listing: precomputed sort orders versus sorting on demand.
+
+Builds collections of N books, then times fetching random pages sorted by
+title, author and year through BookCollection.get_page (a slice of the
+maintained order) next to sorting the whole book list for every page, and
+what keeping the orders up to date adds to an add_book.
+
+    python benchmarks/bench_listing.py --sizes 1000 100000 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_storage import generate_books  # noqa: E402
+from listing import SORT_KEYS, SORT_ORDERS  # noqa: E402
+from main import BookCollection  # noqa: E402
+from storage import SQLiteStorage  # noqa: E402
+
+PAGE_SIZE = 20
+
+
+def median_ms(function, arguments):
+    times = []
+    for argument in arguments:
+        started = time.perf_counter()
+        function(argument)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paginated listing benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--pages", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'books':>10}{'order':>8}{'page ms':>10}{'sort ms':>10}{'add ms':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            path = os.path.join(directory, f"books-{size}.db")
+            storage = SQLiteStorage(path)
+            storage.add_books(generate_books(size))
+            storage.close()
+            collection = BookCollection(path)
+            rng = random.Random(size)
+            pages = [rng.randrange(size // PAGE_SIZE) for _ in range(args.pages)]
+            new_books = list(generate_books(args.pages, seed=1))
+            add_ms = median_ms(lambda book: collection.add_book(**book), new_books)
+            for order in SORT_ORDERS:
+                page_ms = median_ms(lambda page: collection.get_page(page, PAGE_SIZE, order), pages)
+
+                def sorted_page(page):
+                    books = sorted(collection.book_list, key=SORT_KEYS[order])
+                    return books[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]
+
+                sort_ms = median_ms(sorted_page, pages[:5])
+                print(f"{size:>10}{order:>8}{page_ms:>10.3f}{sort_ms:>10.1f}{add_ms:>9.3f}")
+            collection.storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Memory per book of the in-memory collection: dict records versus Book objects.
+
+Builds N books the way BookCollection.read_from_file does (every row with
+its own freshly allocated strings and ints, as SQLite returns them) and
+measures with tracemalloc what the records hold, alone and together with
+the title index: once as the original dicts with a title -> [id] index and
+once as __slots__ Book objects with interned authors/genres and the compact
+title index. Titles are unique per book and cost the same either way, so
+they bound the saving on the totals. The search index is the same for both
+and is left out.
+
+    python benchmarks/bench_memory.py --sizes 100000 1000000
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_storage import generate_books  # noqa: E402
+from book import Book  # noqa: E402
+from main import BookCollection  # noqa: E402
+
+
+def dict_records(count, with_index):
+    books_by_id = {}
+    title_index = {}
+    for book_id, book in enumerate(generate_books(count), 1):
+        book["id"] = book_id
+        books_by_id[book_id] = book
+        if with_index:
+            title_index.setdefault(book["title"].casefold(), []).append(book_id)
+    return books_by_id, title_index
+
+
+def book_records(count, with_index):
+    collection = BookCollection.__new__(BookCollection)
+    collection.books_by_id = {}
+    collection.title_index = {}
+    for book_id, record in enumerate(generate_books(count), 1):
+        record["id"] = book_id
+        book = Book.from_dict(record)
+        collection.books_by_id[book_id] = book
+        if with_index:
+            collection._index_title(book)
+    return collection.books_by_id, collection.title_index
+
+
+def measure(build, count, with_index):
+    """Return the bytes still allocated by what `build` returns."""
+    gc.collect()
+    tracemalloc.start()
+    result = build(count, with_index)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Book record memory benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'books':>10}{'measured':>16}{'dicts MB':>10}{'Book MB':>10}{'dicts B/book':>14}{'Book B/book':>13}"
+          f"{'ratio':>7}")
+    for size in args.sizes:
+        for label, with_index in (("records", False), ("+ title index", True)):
+            dicts = measure(dict_records, size, with_index)
+            books = measure(book_records, size, with_index)
+            print(f"{size:>10}{label:>16}{dicts / 2**20:>10.1f}{books / 2**20:>10.1f}"
+                  f"{dicts / size:>14.0f}{books / size:>13.0f}{dicts / books:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Reading-progress statistics from running totals versus a scan of every book.
+
+Builds N Book objects, feeds them to ReadingStats once, then times what
+show_reading_progress asks for (completion, per-genre completion, top
+authors, backlog by decade) against computing the same numbers by walking
+the whole collection, as the original show_reading_progress did for its
+read count alone.
+
+    python benchmarks/bench_reading_stats.py --sizes 10000 1000000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_storage import generate_books  # noqa: E402
+from book import Book  # noqa: E402
+from reading_stats import ReadingStats, decade_of  # noqa: E402
+
+
+def from_totals(stats):
+    return (stats.completion_rate(), stats.breakdown("genre", limit=10), stats.breakdown("author", limit=5),
+            stats.backlog_by_decade())
+
+
+def by_scan(books):
+    read = sum(1 for book in books if book["read"])
+    genres = Counter(book["genre"] for book in books)
+    genres_read = Counter(book["genre"] for book in books if book["read"])
+    authors = Counter(book["author"] for book in books).most_common(5)
+    backlog = Counter(decade_of(book) for book in books if not book["read"])
+    return read / len(books) * 100, genres, genres_read, authors, backlog
+
+
+def median_ms(function, repeats):
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reading statistics benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'books':>10}{'totals ms':>11}{'scan ms':>10}{'update us':>11}")
+    for size in args.sizes:
+        books = [Book.from_dict(dict(record, id=book_id)) for book_id, record in enumerate(generate_books(size), 1)]
+        stats = ReadingStats()
+        for book in books:
+            stats.add(book)
+        totals_ms = median_ms(lambda: from_totals(stats), args.repeats)
+        scan_ms = median_ms(lambda: by_scan(books), args.repeats)
+
+        # What a single edit costs: take the book out, change it, count it again
+        started = time.perf_counter()
+        for book in books[:10_000]:
+            stats.remove(book)
+            book.read = not book.read
+            stats.add(book)
+        update_us = (time.perf_counter() - started) / min(size, 10_000) * 1e6
+        print(f"{size:>10}{totals_ms:>11.3f}{scan_ms:>10.1f}{update_us:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
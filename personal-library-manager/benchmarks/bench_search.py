@@ -0,0 +1,91 @@
+"""Query and update latency of the search index on large generated libraries.
+
+Titles, authors and genres are built from a synthetic vocabulary, so the
+index sees a realistic number of distinct tokens. Reports median query
+time for exact, prefix (type-ahead), fuzzy and field-scoped queries, plus
+the cost of indexing and unindexing one book.
+
+    python benchmarks/bench_search.py --sizes 100000 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_index import SearchIndex  # noqa: E402
+
+SYLLABLES = ("ka", "lo", "mi", "ren", "sa", "tor", "vel", "an", "dre", "is", "or", "que", "thal", "um", "zen", "bri")
+GENRES = ("Fiction", "Fantasy", "Science Fiction", "Mystery", "Biography", "History", "Poetry", "Romance")
+
+
+def make_vocabulary(rng, size):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randrange(2, 5))))
+    return sorted(words)
+
+
+def generate_books(count, seed=0):
+    rng = random.Random(seed)
+    words = make_vocabulary(rng, 20_000)
+    surnames = make_vocabulary(rng, 5_000)
+    for book_id in range(1, count + 1):
+        yield {
+            "id": book_id,
+            "title": " ".join(rng.choice(words).capitalize() for _ in range(rng.randrange(1, 5))),
+            "author": f"{rng.choice(surnames).capitalize()} {rng.choice(surnames).capitalize()}",
+            "genre": rng.choice(GENRES),
+        }
+
+
+def median_ms(function, arguments):
+    times = []
+    for argument in arguments:
+        started = time.perf_counter()
+        function(argument)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def misspell(rng, word):
+    index = rng.randrange(len(word))
+    return word[:index] + rng.choice("aeiou") + word[index + 1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search index benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'books':>9}{'build s':>9}{'exact':>8}{'prefix':>8}{'fuzzy':>8}{'scoped':>8}{'update':>8}  (ms)")
+    for size in args.sizes:
+        books = list(generate_books(size))
+        index = SearchIndex()
+        started = time.perf_counter()
+        for book in books:
+            index.add(book)
+        build_seconds = time.perf_counter() - started
+
+        rng = random.Random(1)
+        sample = rng.sample(books, args.queries)
+        title_words = [book["title"].split()[0].lower() for book in sample]
+        exact_ms = median_ms(lambda word: index.search(word, fuzzy=False), title_words)
+        prefix_ms = median_ms(index.search, [word[:3] for word in title_words])
+        fuzzy_ms = median_ms(index.search, [misspell(rng, word) for word in title_words])
+        scoped_ms = median_ms(index.search, [f"author:{book['author'].split()[0]} {book['genre']}" for book in sample])
+
+        def update(book):
+            index.remove(book)
+            index.add(book)
+
+        update_ms = median_ms(update, sample)
+        print(f"{size:>9}{build_seconds:>9.1f}{exact_ms:>8.2f}{prefix_ms:>8.2f}{fuzzy_ms:>8.2f}{scoped_ms:>8.2f}{update_ms:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
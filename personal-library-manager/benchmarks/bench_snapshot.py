@@ -0,0 +1,73 @@
+"""Open time of a .booksnap snapshot versus parsing the JSON file.
+
+Writes N generated books both as the original books_data.json and as a
+memory-mapped snapshot, then times json.load of the JSON file (what every
+start used to do) against opening the snapshot as a BookCollection and
+against the first things a session asks for: a page sorted by title, a
+lookup by title and the reading statistics.
+
+    python benchmarks/bench_snapshot.py --sizes 1000 100000 1000000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_storage import generate_books  # noqa: E402
+from main import BookCollection  # noqa: E402
+from snapshot_storage import write_snapshot  # noqa: E402
+
+
+def median_ms(function, repeats):
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot open benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'books':>10}{'json.load ms':>14}{'open ms':>9}{'page ms':>9}{'title ms':>10}{'stats ms':>10}"
+          f"{'file MB':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            books = [dict(book, id=book_id) for book_id, book in enumerate(generate_books(size), 1)]
+            json_path = os.path.join(directory, f"books-{size}.json")
+            with open(json_path, "w") as file:
+                json.dump(books, file, indent=4)
+            snapshot_path = os.path.join(directory, f"books-{size}.booksnap")
+            write_snapshot(books, snapshot_path)
+            titles = [book["title"] for book in random.Random(size).sample(books, args.repeats)]
+            del books
+
+            def load_json():
+                with open(json_path) as file:
+                    json.load(file)
+
+            json_ms = median_ms(load_json, min(args.repeats, 3))
+            open_ms = median_ms(lambda: BookCollection(snapshot_path).storage.close(), args.repeats)
+            collection = BookCollection(snapshot_path)
+            page_ms = median_ms(lambda: collection.get_page(size // 40, 20, "title"), args.repeats)
+            lookups = iter(titles)
+            title_ms = median_ms(lambda: collection.get_book_by_title(next(lookups)), args.repeats)
+            stats_ms = median_ms(collection.get_reading_stats, args.repeats)
+            assert not collection.loaded
+            collection.storage.close()
+            print(f"{size:>10}{json_ms:>14.1f}{open_ms:>9.3f}{page_ms:>9.3f}{title_ms:>10.3f}{stats_ms:>10.1f}"
+                  f"{os.path.getsize(snapshot_path) / 2**20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
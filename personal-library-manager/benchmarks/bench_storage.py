@@ -0,0 +1,78 @@
+"""Single-edit latency of the storage backends as the collection grows.
+
+Fills each backend with N generated books in one transaction, then times
+individual add_book and update_book calls. The SQLite backend should stay
+flat as N grows; the JSON backend rewrites the whole file on every edit.
+
+    python benchmarks/bench_storage.py --sizes 1000 100000 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import JsonFileStorage, SQLiteStorage  # noqa: E402
+
+GENRES = ("Fiction", "Fantasy", "Science Fiction", "Mystery", "Biography", "History", "Poetry")
+# The JSON backend gets unbearably slow past this size
+MAX_JSON_SIZE = 100_000
+
+
+def generate_books(count, seed=0):
+    """Yield `count` random books."""
+    rng = random.Random(seed)
+    for index in range(count):
+        yield {
+            "title": f"Book {index} {rng.choice('ABCDEFGH')}{rng.randrange(10_000)}",
+            "author": f"Author {rng.randrange(count // 10 + 1)}",
+            "year": rng.randrange(1800, 2025),
+            "genre": rng.choice(GENRES),
+            "read": rng.random() < 0.4,
+        }
+
+
+def time_edits(storage, size, edits=50):
+    """Return median (add ms, update ms) over `edits` single-book edits."""
+    add_times = []
+    update_times = []
+    for book in generate_books(edits, seed=1):
+        started = time.perf_counter()
+        book["id"] = storage.add_book(book)
+        add_times.append(time.perf_counter() - started)
+        book["read"] = not book["read"]
+        started = time.perf_counter()
+        storage.update_book(book)
+        update_times.append(time.perf_counter() - started)
+    return statistics.median(add_times) * 1000, statistics.median(update_times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Storage backend edit latency")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'backend':<8}{'books':>10}{'add ms':>10}{'update ms':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            sqlite_storage = SQLiteStorage(os.path.join(directory, f"books-{size}.db"))
+            sqlite_storage.add_books(generate_books(size))
+            add_ms, update_ms = time_edits(sqlite_storage, size)
+            sqlite_storage.close()
+            print(f"{'sqlite':<8}{size:>10}{add_ms:>10.3f}{update_ms:>11.3f}")
+
+            if size <= MAX_JSON_SIZE:
+                json_storage = JsonFileStorage(os.path.join(directory, f"books-{size}.json"))
+                with json_storage.transaction():
+                    for book in generate_books(size):
+                        json_storage.add_book(book)
+                add_ms, update_ms = time_edits(json_storage, size, edits=5)
+                print(f"{'json':<8}{size:>10}{add_ms:>10.3f}{update_ms:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Delete/update-by-title cost with the title index versus the old linear scan.
+
+Builds collections of N books, then times removing and re-adding random
+titles and editing them through BookCollection (index lookups plus one
+SQLite row write each), next to the original approach of scanning the list
+comparing lowercased titles and calling list.remove.
+
+    python benchmarks/bench_title_index.py --sizes 1000 100000 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_storage import generate_books  # noqa: E402
+from main import BookCollection  # noqa: E402
+from storage import SQLiteStorage  # noqa: E402
+
+
+def linear_remove(book_list, title):
+    """The original delete_book: scan comparing lowercased titles, then list.remove."""
+    for book in book_list:
+        if book["title"].lower() == title.lower():
+            book_list.remove(book)
+            return book
+    return None
+
+
+def median_ms(function, titles):
+    times = []
+    for title in titles:
+        started = time.perf_counter()
+        function(title)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Title index benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--edits", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'books':>10}{'remove+add ms':>15}{'edit ms':>10}{'linear remove ms':>18}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            path = os.path.join(directory, f"books-{size}.db")
+            storage = SQLiteStorage(path)
+            storage.add_books(generate_books(size))
+            storage.close()
+            collection = BookCollection(path)
+            titles = random.Random(size).sample([book["title"] for book in collection.books_by_id.values()], args.edits)
+
+            def remove_and_add(title):
+                book = collection.remove_book(title)
+                collection.add_book(book["title"], book["author"], book["year"], book["genre"], book["read"])
+
+            def edit(title):
+                book = collection.get_book_by_title(title)
+                collection.edit_book(book, read=not book["read"])
+
+            remove_ms = median_ms(remove_and_add, titles)
+            edit_ms = median_ms(edit, titles)
+            book_list = collection.book_list
+            linear_ms = median_ms(lambda title: linear_remove(book_list, title), titles[:20])
+            collection.storage.close()
+            print(f"{size:>10}{remove_ms:>15.3f}{edit_ms:>10.3f}{linear_ms:>18.3f}")
+
+
+if __name__ == "__main__":
+    main()
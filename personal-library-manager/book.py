@@ -0,0 +1,83 @@
+import sys
+
+BOOK_SLOTS = ("id", "title", "author", "year", "genre", "read")
+
+# One shared int object per distinct year instead of one per book
+_years = {}
+
+
+def compact_year(year):
+    """Store numeric years as shared ints and keep anything else as given."""
+    if isinstance(year, str):
+        stripped = year.strip()
+        if stripped.isascii() and stripped.isdigit() and len(stripped) <= 4:
+            year = int(stripped)
+        else:
+            return year
+    if isinstance(year, int):
+        return _years.setdefault(year, year)
+    return year
+
+
+class Book:
+    """One book of the collection, stored in __slots__ instead of a dict.
+
+    Authors and genres repeat across many books, so they are interned and
+    every book points at the same string. Books still support dict-style
+    access (book["title"], book.get, book.update), so code written for the
+    old dict records keeps working."""
+
+    __slots__ = BOOK_SLOTS
+
+    def __init__(self, title, author, year, genre, read, id=None):
+        self.id = id
+        self.title = title
+        self.author = sys.intern(author)
+        self.year = compact_year(year)
+        self.genre = sys.intern(genre)
+        self.read = bool(read)
+
+    @classmethod
+    def from_dict(cls, record):
+        return cls(record["title"], record["author"], record["year"], record["genre"], record["read"], record.get("id"))
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in BOOK_SLOTS}
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if key not in BOOK_SLOTS:
+            raise KeyError(key)
+        if key in ("author", "genre"):
+            value = sys.intern(value)
+        elif key == "year":
+            value = compact_year(value)
+        elif key == "read":
+            value = bool(value)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in BOOK_SLOTS
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in BOOK_SLOTS else default
+
+    def keys(self):
+        return BOOK_SLOTS
+
+    def update(self, changes=(), **more_changes):
+        for key, value in dict(changes, **more_changes).items():
+            self[key] = value
+
+    def __eq__(self, other):
+        if isinstance(other, Book):
+            return all(getattr(self, name) == getattr(other, name) for name in BOOK_SLOTS)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Book({', '.join(f'{name}={getattr(self, name)!r}' for name in BOOK_SLOTS)})"
@@ -0,0 +1,113 @@
+import csv
+import json
+from itertools import islice
+
+from storage import BOOK_FIELDS
+
+FORMATS = ("csv", "jsonl", "goodreads")
+IMPORT_BATCH_SIZE = 10_000
+TRUE_VALUES = {"yes", "y", "true", "1", "read"}
+# Shelves that say where a book is rather than what it is
+GOODREADS_STATUS_SHELVES = {"read", "to-read", "currently-reading"}
+
+
+def detect_format(path):
+    """Guess a file's format: .jsonl/.ndjson, Goodreads library export, or plain CSV."""
+    if path.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    with open(path, "r", encoding="utf-8-sig", newline="") as file:
+        header = next(csv.reader(file), [])
+    return "goodreads" if "Exclusive Shelf" in header else "csv"
+
+
+def _goodreads_record(row):
+    shelves = [shelf.strip() for shelf in (row.get("Bookshelves") or "").split(",")]
+    genres = [shelf for shelf in shelves if shelf and shelf not in GOODREADS_STATUS_SHELVES]
+    return {
+        "title": row.get("Title"),
+        "author": row.get("Author"),
+        "year": row.get("Original Publication Year") or row.get("Year Published") or "",
+        "genre": genres[0] if genres else "",
+        "read": row.get("Exclusive Shelf") == "read",
+    }
+
+
+def read_records(path, format=None):
+    """Yield the book records of a CSV, JSONL or Goodreads export one at a time.
+
+    Records are not validated here; a line that is not valid JSON is
+    yielded as None so the importer can count it as invalid."""
+    format = format or detect_format(path)
+    if format not in FORMATS:
+        raise ValueError(f"Unknown format {format!r}, expected one of {', '.join(FORMATS)}")
+    with open(path, "r", encoding="utf-8-sig", newline="") as file:
+        if format == "jsonl":
+            for line in file:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield None
+        elif format == "goodreads":
+            for row in csv.DictReader(file):
+                yield _goodreads_record(row)
+        else:
+            yield from csv.DictReader(file)
+
+
+def clean_record(record):
+    """Return a record's BOOK_FIELDS with whitespace trimmed and read as a bool.
+    Raises ValueError if it is not a mapping, has no title or author, or its
+    year is not text, a whole number or empty."""
+    if not isinstance(record, dict):
+        raise ValueError("Not a book record")
+    title = str(record.get("title") or "").strip()
+    author = str(record.get("author") or "").strip()
+    if not title or not author:
+        raise ValueError("A book needs a title and an author")
+    year = record.get("year")
+    if year is not None and (not isinstance(year, (str, int)) or isinstance(year, bool)):
+        raise ValueError(f"Year must be text or a whole number, not {type(year).__name__}")
+    if isinstance(year, int) and not -2**63 <= year < 2**63:
+        raise ValueError(f"Year {year} is out of range")
+    read = record.get("read")
+    if not isinstance(read, bool):
+        read = str(read or "").strip().lower() in TRUE_VALUES
+    return {
+        "title": title,
+        "author": author,
+        "year": year.strip() if isinstance(year, str) else ("" if year is None else year),
+        "genre": str(record.get("genre") or "").strip(),
+        "read": read,
+    }
+
+
+def batches(records, size=IMPORT_BATCH_SIZE):
+    """Split an iterable into lists of at most `size` items without reading ahead further."""
+    records = iter(records)
+    while True:
+        batch = list(islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+
+def write_records(books, path, format="csv"):
+    """Stream books to a CSV or JSONL file and return how many were written."""
+    if format not in ("csv", "jsonl"):
+        raise ValueError(f"Cannot export to {format!r}, expected csv or jsonl")
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        if format == "jsonl":
+            for book in books:
+                file.write(json.dumps({field: book[field] for field in BOOK_FIELDS}, ensure_ascii=False) + "\n")
+                count += 1
+        else:
+            writer = csv.writer(file)
+            writer.writerow(BOOK_FIELDS)
+            for book in books:
+                writer.writerow([book["title"], book["author"], book["year"], book["genre"],
+                                 "yes" if book["read"] else "no"])
+                count += 1
+    return count
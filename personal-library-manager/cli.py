@@ -0,0 +1,163 @@
+"""
+Command-line interface to the book collection, for scripts and one-shot use
+
+    python cli.py add "Dune" "Frank Herbert" --year 1965 --genre "Science Fiction" --read
+    python cli.py list --sort year --unread --page 2
+    python cli.py find herbert
+    python cli.py update "Dune" --read
+    python cli.py rm "Dune"
+    python cli.py stats
+    python cli.py import goodreads_library_export.csv
+    python cli.py export books.jsonl --sort title
+    python cli.py export library.booksnap && python cli.py --db library.booksnap list
+
+Commands that look up, list or change single books are answered by the
+storage backend and never load the whole collection; import, find --ranked
+and the interactive app (main.py) load it on first use.
+"""
+import argparse
+import sqlite3
+import sys
+
+from listing import DEFAULT_PAGE_SIZE, SORT_ORDERS, format_book
+from main import BookCollection
+from search_index import SEARCH_FIELDS
+from storage import DEFAULT_DATABASE
+
+
+def write_books(books, start=1):
+    """Write numbered book lines in one buffered write; returns how many there were."""
+    lines = [format_book(index, book) for index, book in enumerate(books, start)]
+    sys.stdout.write("".join(lines))
+    return len(lines)
+
+
+def add_filter_arguments(parser):
+    status = parser.add_mutually_exclusive_group()
+    status.add_argument("--read", dest="read", action="store_true", default=None, help="only books you have read")
+    status.add_argument("--unread", dest="read", action="store_false", help="only books you have not read")
+    parser.add_argument("--genre", help="only this genre")
+    parser.add_argument("--author", help="only this author")
+
+
+def filters_from(args):
+    filters = {"read": args.read, "genre": args.genre, "author": args.author}
+    return {field: value for field, value in filters.items() if value is not None}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Manage your book collection from the command line")
+    parser.add_argument("--db", default=DEFAULT_DATABASE,
+                        help="collection file: an SQLite database, .journal, .json or a read-only .booksnap"
+                             " snapshot (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="add a book")
+    add.add_argument("title")
+    add.add_argument("author")
+    add.add_argument("--year", default="")
+    add.add_argument("--genre", default="")
+    add.add_argument("--read", action="store_true", help="mark the book as read")
+
+    remove = commands.add_parser("rm", help="remove a book by title")
+    remove.add_argument("title")
+
+    find = commands.add_parser("find", help="find books whose title, author or genre contain every word")
+    find.add_argument("query")
+    find.add_argument("--field", choices=SEARCH_FIELDS, action="append", help="search only this field (repeatable)")
+    find.add_argument("--limit", type=int, default=50)
+    find.add_argument("--ranked", action="store_true",
+                      help="rank by relevance with prefix and misspelling matching (loads the whole collection)")
+
+    update = commands.add_parser("update", help="change the details of a book found by title")
+    update.add_argument("title")
+    update.add_argument("--title", dest="new_title")
+    update.add_argument("--author")
+    update.add_argument("--year")
+    update.add_argument("--genre")
+    status = update.add_mutually_exclusive_group()
+    status.add_argument("--read", dest="read", action="store_true", default=None)
+    status.add_argument("--unread", dest="read", action="store_false")
+
+    listing = commands.add_parser("list", help="list books a page at a time")
+    listing.add_argument("--sort", choices=SORT_ORDERS, help="default: the order books were added")
+    listing.add_argument("--desc", action="store_true", help="reverse the order")
+    listing.add_argument("--page", type=int, default=1)
+    listing.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    add_filter_arguments(listing)
+
+    commands.add_parser("stats", help="show reading progress")
+
+    importing = commands.add_parser("import", help="import books from a CSV, JSONL or Goodreads export file")
+    importing.add_argument("file")
+    importing.add_argument("--format", choices=("csv", "jsonl", "goodreads"), help="default: detected")
+
+    export = commands.add_parser("export", help="export books to a CSV, JSONL or read-only .booksnap snapshot file")
+    export.add_argument("file")
+    export.add_argument("--format", choices=("csv", "jsonl", "snapshot"), help="default: from the file extension")
+    export.add_argument("--sort", choices=SORT_ORDERS)
+    add_filter_arguments(export)
+    return parser
+
+
+def run(collection, args):
+    """Carry out one parsed command and return the exit status."""
+    if args.command == "add":
+        book = collection.add_book(args.title, args.author, args.year, args.genre, args.read)
+        print(f"Added {book['title']} (id {book['id']})")
+    elif args.command == "rm":
+        if collection.remove_book(args.title) is None:
+            print(f"No book titled {args.title!r}", file=sys.stderr)
+            return 1
+        print(f"Removed {args.title}")
+    elif args.command == "find":
+        fields = tuple(args.field or SEARCH_FIELDS)
+        if args.ranked:
+            books = collection.search_books(args.query, fields, args.limit)
+        else:
+            books = collection.find_books(args.query, fields, args.limit)
+        if not write_books(books):
+            print("No books found", file=sys.stderr)
+            return 1
+    elif args.command == "update":
+        book = collection.get_book_by_title(args.title)
+        if book is None:
+            print(f"No book titled {args.title!r}", file=sys.stderr)
+            return 1
+        changes = {"title": args.new_title, "author": args.author, "year": args.year, "genre": args.genre,
+                   "read": args.read}
+        collection.edit_book(book, **{field: value for field, value in changes.items() if value is not None})
+        write_books([book])
+    elif args.command == "list":
+        page = max(args.page, 1) - 1
+        books = collection.get_page(page, args.page_size, args.sort, args.desc, **filters_from(args))
+        write_books(books, start=page * args.page_size + 1)
+    elif args.command == "stats":
+        collection.show_reading_progress()
+    elif args.command == "import":
+        counts = collection.import_file(args.file, args.format)
+        print(f"Imported {counts['added']} books, skipped {counts['duplicates']} duplicates"
+              f" and {counts['invalid']} invalid rows")
+    elif args.command == "export":
+        count = collection.export_file(args.file, args.format, args.sort, **filters_from(args))
+        print(f"Exported {count} books to {args.file}")
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    collection = None
+    try:
+        # Opening fails on a missing snapshot or a file that is not a collection
+        collection = BookCollection(args.db)
+        status = run(collection, args)
+    except (OSError, ValueError, sqlite3.DatabaseError) as error:
+        sys.exit(str(error))
+    finally:
+        if collection is not None:
+            collection.storage.close()
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from storage import BOOK_FIELDS, StorageBackend
+
+DEFAULT_JOURNAL = "books.journal"
+
+
+class JournalStorage(StorageBackend):
+    """File-based storage as an append-only operation log plus a periodic snapshot.
+
+    Every add, update and delete appends one JSON line to <path>, so an edit
+    costs one small write no matter how big the collection is. A background
+    thread fsyncs the log in batches (at most `sync_interval` seconds after a
+    change) and, once the log has grown past the size of the collection,
+    compacts it: the current state is written to <path>.snapshot via a temp
+    file and an atomic rename, and the log starts over. Loading reads the
+    snapshot and replays the log on top of it.
+
+    Replaying an operation sets or removes one book by id, so replaying a log
+    that the snapshot already contains (after a crash mid-compaction) gives
+    the same state again."""
+
+    def __init__(self, path=DEFAULT_JOURNAL, sync_interval=0.05, sync_batch=1000, compact_min_operations=1000):
+        self.path = path
+        self.snapshot_path = path + ".snapshot"
+        self.compacting_path = path + ".compacting"
+        self.sync_interval = sync_interval
+        self.sync_batch = sync_batch
+        self.compact_min_operations = compact_min_operations
+        self.books = {}  # id -> book; stored dicts are replaced, never mutated
+        self.next_id = 1
+        self.logged_operations = 0
+        self.unsynced_operations = 0
+
+        self._load()
+        self.log = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.RLock()
+        self._wake = threading.Condition(self._lock)
+        self._compact_lock = threading.Lock()  # One compaction at a time
+        self._batch_depth = 0
+        self._compact_requested = False
+        self._closed = False
+        self._worker = threading.Thread(target=self._background, name="journal-sync", daemon=True)
+        self._worker.start()
+
+    def _load(self):
+        """Rebuild the books from the snapshot and every log written after it."""
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as file:
+                snapshot = json.load(file)
+            self.books = {book["id"]: book for book in snapshot["books"]}
+            self.next_id = snapshot["next_id"]
+        except FileNotFoundError:
+            pass
+        for log_path in (self.compacting_path, self.path):
+            self.logged_operations += self._replay(log_path)
+
+        if os.path.exists(self.compacting_path):
+            # A compaction was interrupted: finish it before appending again
+            self._write_snapshot(list(self.books.values()), self.next_id)
+            open(self.path, "w").close()
+            os.remove(self.compacting_path)
+            self.logged_operations = 0
+
+    def _replay(self, log_path):
+        """Apply every complete operation in a log file and return how many there were."""
+        try:
+            file = open(log_path, "r+", encoding="utf-8")
+        except FileNotFoundError:
+            return 0
+        with file:
+            count = 0
+            valid_bytes = 0
+            for line in file:
+                try:
+                    operation = json.loads(line)
+                except ValueError:
+                    break  # A write torn by a crash; nothing after it was acknowledged
+                if not line.endswith("\n"):
+                    break
+                self._apply(operation)
+                count += 1
+                valid_bytes += len(line.encode("utf-8"))
+            file.truncate(valid_bytes)
+        return count
+
+    def _apply(self, operation):
+        book_id = operation["id"]
+        if operation["op"] == "delete":
+            self.books.pop(book_id, None)
+        else:
+            self.books[book_id] = dict(operation["book"], id=book_id)
+        self.next_id = max(self.next_id, book_id + 1)
+
+    def _append(self, operation):
+        """Apply an operation and add it to the log; the background thread syncs it."""
+        with self._lock:
+            self._apply(operation)
+            self.log.write(json.dumps(operation, separators=(",", ":")) + "\n")
+            self.logged_operations += 1
+            self.unsynced_operations += 1
+            if self.unsynced_operations >= self.sync_batch and not self._batch_depth:
+                self._sync()
+            if self.logged_operations >= max(self.compact_min_operations, len(self.books)):
+                self._compact_requested = True
+            self._wake.notify()
+
+    def load_books(self):
+        with self._lock:
+            return [dict(book) for book in self.books.values()]
+
+    def add_book(self, book):
+        with self._lock:
+            book_id = self.next_id
+            self._append({"op": "add", "id": book_id, "book": {field: book[field] for field in BOOK_FIELDS}})
+            return book_id
+
+    def update_book(self, book):
+        self._append({"op": "update", "id": book["id"], "book": {field: book[field] for field in BOOK_FIELDS}})
+
+    def delete_book(self, book_id):
+        self._append({"op": "delete", "id": book_id})
+
+    @contextmanager
+    def transaction(self):
+        """Hold back syncing until the batch is complete, then sync it once.
+        If the block raises, the batch's operations are cut off the end of the
+        log and the books restored as they were; nothing is compacted meanwhile."""
+        with self._lock:
+            self._batch_depth += 1
+            outermost = self._batch_depth == 1
+            if outermost:
+                self.log.flush()
+                # Stored book dicts are never mutated, so a shallow copy is a full backup
+                saved = (self.log.tell(), dict(self.books), self.next_id,
+                         self.logged_operations, self.unsynced_operations)
+        try:
+            yield
+        except BaseException:
+            if outermost:
+                with self._lock:
+                    log_size, self.books, self.next_id, self.logged_operations, self.unsynced_operations = saved
+                    self.log.truncate(log_size)
+            raise
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self._sync()
+
+    def count(self):
+        return len(self.books)
+
+    def flush(self):
+        with self._lock:
+            self._sync()
+
+    def _sync(self):
+        if self.unsynced_operations:
+            self.log.flush()
+            os.fsync(self.log.fileno())
+            self.unsynced_operations = 0
+
+    def compact(self):
+        """Write a snapshot of the current state and start a new, empty log."""
+        with self._compact_lock:
+            with self._lock:
+                if self._batch_depth:
+                    return  # A transaction started meanwhile; rolling it back needs the current log
+                self._sync()
+                self.log.close()
+                os.replace(self.path, self.compacting_path)
+                self.log = open(self.path, "a", encoding="utf-8")
+                books = list(self.books.values())
+                next_id = self.next_id
+                self.logged_operations = 0
+                self._compact_requested = False
+
+            # Stored book dicts are never mutated, so the snapshot is written
+            # from the copied list without holding the lock
+            self._write_snapshot(books, next_id)
+            os.remove(self.compacting_path)
+
+    def _write_snapshot(self, books, next_id):
+        """Replace the snapshot atomically: write a temp file, sync it, rename it over."""
+        temporary = self.snapshot_path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump({"next_id": next_id, "books": books}, file, separators=(",", ":"))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.snapshot_path)
+        _fsync_directory(self.snapshot_path)
+
+    def _background(self):
+        """Sync the log at most sync_interval after a change and compact when asked to."""
+        while True:
+            with self._lock:
+                while not self._closed and not self.unsynced_operations and not self._compact_requested:
+                    self._wake.wait()
+                if self._closed:
+                    return
+                compact = self._compact_requested and not self._batch_depth
+                if not compact:
+                    # Let further changes join this sync
+                    deadline = time.monotonic() + self.sync_interval
+                    remaining = self.sync_interval
+                    while not self._closed and remaining > 0:
+                        self._wake.wait(remaining)
+                        remaining = deadline - time.monotonic()
+                    if not self._batch_depth:
+                        self._sync()
+            if compact:
+                self.compact()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wake.notify()
+        self._worker.join()
+        with self._lock:
+            self._sync()
+            self.log.close()
+
+
+def _fsync_directory(path):
+    """Persist a rename by syncing the directory that holds the file."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return  # Windows has no directory handles; the rename is already durable
+    descriptor = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
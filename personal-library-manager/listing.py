@@ -0,0 +1,85 @@
+from bisect import bisect_left
+
+SORT_ORDERS = ("title", "author", "year")
+DEFAULT_PAGE_SIZE = 20
+
+
+def _year_key(year):
+    # Numeric years sort first and by value, anything else after them as text
+    return (0, year) if isinstance(year, int) else (1, str(year).casefold())
+
+
+SORT_KEYS = {
+    "title": lambda book: (book["title"].casefold(), book["id"]),
+    "author": lambda book: (book["author"].casefold(), book["title"].casefold(), book["id"]),
+    "year": lambda book: (_year_key(book["year"]), book["title"].casefold(), book["id"]),
+}
+# The book fields each sort key reads, so an edit only moves a book in the orders it affects
+SORT_FIELDS = {
+    "title": {"title"},
+    "author": {"author", "title"},
+    "year": {"year", "title"},
+}
+
+
+def format_book(index, book):
+    """One numbered line of a book listing."""
+    reading_status = "Read" if book["read"] else "Unread"
+    return f"{index}. {book['title']} by {book['author']} ({book['year']}) - {book['genre']} - {reading_status}\n"
+
+
+def matches(book, filters):
+    """Whether a book passes every filter: read (bool), or genre/author (case-insensitive)."""
+    for field, wanted in filters.items():
+        if field == "read":
+            if bool(book["read"]) != wanted:
+                return False
+        elif book[field].casefold() != wanted.casefold():
+            return False
+    return True
+
+
+class SortOrders:
+    """Book ids kept sorted by title, author and year as books change.
+
+    Each order is a plain list of ids; the sort key is computed from the book
+    when bisecting, so an order costs one pointer per book. Reading a page of
+    any order is then a slice instead of a sort of the whole collection."""
+
+    def __init__(self, books_by_id):
+        self.books_by_id = books_by_id
+        self.orders = {name: [] for name in SORT_ORDERS}
+
+    def rebuild(self):
+        """Sort every order from scratch (after loading the collection)."""
+        books = self.books_by_id
+        for name, sort_key in SORT_KEYS.items():
+            self.orders[name] = sorted(books, key=lambda book_id: sort_key(books[book_id]))
+
+    def _position(self, name, book):
+        sort_key = SORT_KEYS[name]
+        books = self.books_by_id
+        return bisect_left(self.orders[name], sort_key(book), key=lambda book_id: sort_key(books[book_id]))
+
+    def add(self, book, names=SORT_ORDERS):
+        """Insert a book, which must already be in books_by_id, into the given orders (default: all)."""
+        for name in names:
+            self.orders[name].insert(self._position(name, book), book["id"])
+
+    def remove(self, book, names=SORT_ORDERS):
+        """Remove a book from the given orders; it must be in books_by_id with the field values it was
+        added with."""
+        for name in names:
+            del self.orders[name][self._position(name, book)]
+
+    @staticmethod
+    def affected(fields):
+        """The orders whose position for a book depends on any of these fields."""
+        return [name for name in SORT_ORDERS if SORT_FIELDS[name] & fields]
+
+    def iter_ids(self, sort_by, descending=False, start=0):
+        """Yield ids in the given order, beginning at position `start`."""
+        order = self.orders[sort_by]
+        if descending:
+            return (order[position] for position in range(len(order) - 1 - start, -1, -1))
+        return (order[position] for position in range(start, len(order)))
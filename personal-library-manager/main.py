@@ -1,27 +1,293 @@
-import json
+import sys
+from contextlib import ExitStack
+from itertools import islice
+
+from book import Book
+from bulk_io import IMPORT_BATCH_SIZE, batches, clean_record, read_records, write_records
+from listing import DEFAULT_PAGE_SIZE, SortOrders, format_book, matches
+from reading_stats import ReadingStats
+from search_index import SEARCH_FIELDS, SearchIndex
+from snapshot_storage import SNAPSHOT_SUFFIX, write_snapshot
+from storage import DEFAULT_DATABASE, open_storage
+
+# In-memory indexes that read_from_file builds from the whole collection
+LOADED_ATTRIBUTES = ("books_by_id", "title_index", "search_index", "reading_stats", "sort_orders")
 
 class BookCollection: 
     """A class to manage a collection of books, allowing users to store and organize thier reading materials."""
 
-    def __init__(self):
-        """Initialize a new book collection with an empty list and set up file storage."""
-        self.book_list = []
-        self.storage_file = "books_data.json"
-        self.read_from_file()
+    def __init__(self, storage_file=DEFAULT_DATABASE):
+        """Initialize a new book collection and open its storage backend.
+        A books_data.json from older versions is migrated into the database on first start.
+
+        The books are not read until something needs the in-memory indexes;
+        until then lookups, listings and changes go straight to the storage
+        backend, so a one-shot command does not pay for loading everything."""
+        self.storage_file = storage_file
+        self.storage = open_storage(storage_file)
+
+    def __getattr__(self, name):
+        # Only called for attributes that are not set: load the indexes on first use
+        if name in LOADED_ATTRIBUTES:
+            self.read_from_file()
+            return self.__dict__[name]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    @property
+    def loaded(self):
+        """Whether the in-memory indexes have been built."""
+        return "books_by_id" in self.__dict__
+
+    def count(self):
+        """Number of books in the collection."""
+        return len(self.books_by_id) if self.loaded else self.storage.count()
+
+    @property
+    def book_list(self):
+        """All books in the order they were added."""
+        return list(self.books_by_id.values())
 
     def read_from_file(self):
-        """Load saved books from a JSON file into memory.
-        if the file doesn't exist or is corrupted, start with an empty collection."""
+        """Load saved books from the storage backend into memory and index them."""
+        self.books_by_id = {}
+        self.title_index = {}
+        self.search_index = SearchIndex()
+        self.reading_stats = ReadingStats()
+        for record in self.storage.load_books():
+            book = Book.from_dict(record)
+            self.books_by_id[book.id] = book
+            self._index_title(book)
+            self.reading_stats.add(book)
+        self.search_index.add_many(self.books_by_id.values())
+        self.sort_orders = SortOrders(self.books_by_id)
+        self.sort_orders.rebuild()
+
+    @staticmethod
+    def _title_key(title):
+        key = title.casefold()
+        # Most titles casefold to a different string, but when they don't the
+        # index shares the book's own title instead of holding a copy
+        return title if key == title else key
+
+    def _index_title(self, book):
+        """Add a book to the casefolded title -> id index.
+        A title held by several books maps to a list of their ids instead."""
+        key = self._title_key(book.title)
+        book_ids = self.title_index.get(key)
+        if book_ids is None:
+            self.title_index[key] = book.id
+        elif isinstance(book_ids, list):
+            book_ids.append(book.id)
+        else:
+            self.title_index[key] = [book_ids, book.id]
+
+    def _unindex_title(self, book):
+        """Remove a book from the title index."""
+        key = self._title_key(book.title)
+        book_ids = self.title_index[key]
+        if not isinstance(book_ids, list):
+            del self.title_index[key]
+            return
+        book_ids.remove(book.id)  # Only books sharing this exact title
+        if len(book_ids) == 1:
+            self.title_index[key] = book_ids[0]
+
+    def get_book_by_title(self, title):
+        """Return the first book with this title (ignoring case), or None."""
+        if not self.loaded:
+            records = self.storage.find_by_title(title)
+            return Book.from_dict(records[0]) if records else None
+        book_ids = self.title_index.get(title.casefold())
+        if book_ids is None:
+            return None
+        return self.books_by_id[book_ids[0] if isinstance(book_ids, list) else book_ids]
+
+    def find_duplicate(self, title, author):
+        """Return a stored book with this title and author (ignoring case), or None."""
+        book_ids = self.title_index.get(title.casefold())
+        if book_ids is None:
+            return None
+        author = author.casefold()
+        for book_id in book_ids if isinstance(book_ids, list) else (book_ids,):
+            book = self.books_by_id[book_id]
+            if book.author.casefold() == author:
+                return book
+        return None
+
+    def add_book(self, title, author, year, genre, read):
+        """Store a new book and return it."""
+        new_book = Book(title, author, year, genre, read)
+        new_book.id = self.storage.add_book(new_book)
+        if not self.loaded:
+            return new_book
+        self.books_by_id[new_book.id] = new_book
+        self._index_title(new_book)
+        self.search_index.add(new_book)
+        self.reading_stats.add(new_book)
+        self.sort_orders.add(new_book)
+        return new_book
+
+    def remove_book(self, title):
+        """Remove the first book with this title and return it, or None if there is none.
+        Dicts delete in O(1) by leaving a tombstone, so no list has to be shifted."""
+        book = self.get_book_by_title(title)
+        if book is None:
+            return None
+        if not self.loaded:
+            self.storage.delete_book(book["id"])
+            return book
+        self.sort_orders.remove(book)
+        del self.books_by_id[book["id"]]
+        self._unindex_title(book)
+        self.search_index.remove(book)
+        self.reading_stats.remove(book)
+        self.storage.delete_book(book["id"])
+        return book
+
+    def edit_book(self, book, **changes):
+        """Change some fields of a stored book and save it.
+        Only the indexes that read a changed field are updated, so toggling
+        read costs O(1); re-sorting a book is a bisect and a list shift."""
+        if not self.loaded:
+            book.update(changes)
+            self.storage.update_book(book)
+            return book
+        # A value of another type (1999 for "1999") may be stored differently, so it counts as a change
+        changed = {field for field, value in changes.items()
+                   if book[field] != value or type(book[field]) is not type(value)}
+        orders = self.sort_orders.affected(changed)
+        searched = not changed.isdisjoint(SEARCH_FIELDS)
+        if "title" in changed:
+            self._unindex_title(book)
+        if searched:
+            self.search_index.remove(book)
+        self.reading_stats.remove(book)
+        self.sort_orders.remove(book, orders)
+        book.update(changes)
+        if "title" in changed:
+            self._index_title(book)
+        if searched:
+            self.search_index.add(book)
+        self.reading_stats.add(book)
+        self.sort_orders.add(book, orders)
+        self.storage.update_book(book)
+        return book
+
+    def search_books(self, query, fields=SEARCH_FIELDS, limit=None):
+        """Return the books matching a search query, best matches first.
+        Supports field:word terms, type-ahead prefixes and misspellings (see SearchIndex.search)."""
+        return [self.books_by_id[book_id] for book_id, _ in self.search_index.search(query, fields, limit)]
+
+    def find_books(self, query, fields=SEARCH_FIELDS, limit=None):
+        """Return the books where every query word appears in one of the fields, by title.
+        A plain substring match answered by the storage backend, so unlike
+        search_books it does not load the collection's indexes."""
+        return [Book.from_dict(record) for record in self.storage.find_books(query, fields, limit)]
+
+    def iter_books(self, sort_by=None, descending=False, start=0, **filters):
+        """Yield books sorted by "title", "author" or "year" (None keeps the order they were added)
+        that match the filters (read, genre, author), skipping the first `start` of them."""
+        if not self.loaded:
+            return map(Book.from_dict, self.storage.iter_books(sort_by, descending, start, **filters))
+        if filters:
+            # A filtered listing has to be walked to know where position `start` is
+            books = self.iter_books(sort_by, descending)
+            books = (book for book in books if matches(book, filters))
+            return islice(books, start, None) if start else books
+        if sort_by is None:
+            books = self.books_by_id.values()
+            books = reversed(books) if descending else iter(books)
+            return islice(books, start, None) if start else books
+        return map(self.books_by_id.__getitem__, self.sort_orders.iter_ids(sort_by, descending, start))
+
+    def get_page(self, page, page_size=DEFAULT_PAGE_SIZE, sort_by=None, descending=False, **filters):
+        """Return page number `page` (from 0) of a listing as a list of books.
+        Without filters a sorted page is read straight from its position in the sort order."""
+        return list(islice(self.iter_books(sort_by, descending, page * page_size, **filters), page_size))
+
+    def get_reading_stats(self):
+        """Return the collection's ReadingStats, aggregated by the storage backend until the indexes are loaded."""
+        return self.reading_stats if self.loaded else self.storage.reading_stats()
+
+    def import_books(self, records, batch_size=IMPORT_BATCH_SIZE):
+        """Add books from an iterable of records, such as bulk_io.read_records yields.
+
+        Records without a title or author are skipped as invalid, and books
+        whose title and author are already in the collection (or earlier in
+        the import) as duplicates. Records are read and written in batches of
+        `batch_size`, all inside one storage transaction; if the import fails
+        it is rolled back (every backend undoes a failed transaction) and the
+        collection reloaded.
+        Returns the counts of added, duplicate and invalid records."""
+        counts = {"added": 0, "duplicates": 0, "invalid": 0}
+        existing = len(self.books_by_id)
+        imported = []
         try:
-            with open(self.storage_file, "r") as file:
-                self.book_list = json.load(file)
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.book_list = []
+            with ExitStack() as stack:
+                stack.enter_context(self.storage.transaction())
+                stack.enter_context(self.search_index.bulk_add())
+                deferring_indexes = False
+                for batch in batches(records, batch_size):
+                    if not deferring_indexes and len(imported) + len(batch) > existing // 4:
+                        # Rebuilding the storage indexes once is now cheaper than updating them per row
+                        stack.enter_context(self.storage.deferred_indexes())
+                        deferring_indexes = True
+                    new_books = []
+                    seen = set()
+                    for record in batch:
+                        try:
+                            fields = clean_record(record)
+                        except ValueError:
+                            counts["invalid"] += 1
+                            continue
+                        key = (fields["title"].casefold(), fields["author"].casefold())
+                        if key in seen or self.find_duplicate(fields["title"], fields["author"]) is not None:
+                            counts["duplicates"] += 1
+                            continue
+                        seen.add(key)
+                        new_books.append(Book(**fields))
+
+                    for book, book_id in zip(new_books, self.storage.add_books(new_books)):
+                        book.id = book_id
+                        self.books_by_id[book_id] = book
+                        self._index_title(book)
+                        self.reading_stats.add(book)
+                        self.search_index.add(book)
+                    imported.extend(new_books)
+                    counts["added"] += len(new_books)
+        except BaseException:
+            self.read_from_file()
+            raise
+
+        # Inserting into the sort orders costs O(n) per book; past a few
+        # hundredths of the collection sorting everything once is cheaper
+        if len(imported) > len(self.books_by_id) // 50:
+            self.sort_orders.rebuild()
+        else:
+            for book in imported:
+                self.sort_orders.add(book)
+        return counts
+
+    def import_file(self, path, format=None, batch_size=IMPORT_BATCH_SIZE):
+        """Import a CSV, JSONL or Goodreads export file (see import_books)."""
+        return self.import_books(read_records(path, format), batch_size)
+
+    def export_file(self, path, format=None, sort_by=None, **filters):
+        """Write the books (optionally sorted and filtered) to a CSV, JSONL or snapshot file; returns the count.
+        The format follows the file extension unless given. A .booksnap snapshot
+        can be opened as a read-only collection that loads in constant time."""
+        if format is None:
+            if path.endswith(SNAPSHOT_SUFFIX):
+                format = "snapshot"
+            else:
+                format = "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+        if format == "snapshot":
+            return write_snapshot(self.iter_books(sort_by, **filters), path)
+        return write_records(self.iter_books(sort_by, **filters), path, format)
 
     def save_to_file(self):
-        """Store the Current book collection to a JSONJ file fpr permanent storage."""
-        with open(self.storage_file, "w") as file:
-            json.dump(self.book_list, file, indent=4)
+        """Make sure every change is on disk; each change is already written as it happens."""
+        self.storage.flush()
 
     def create_new_book(self):
         """Add a new book to the collection by gathering information from the user."""
@@ -33,92 +299,133 @@ class BookCollection:
             input("Have you read this book? (yes/no):").strip().lower() == "yes"
         )
 
-        new_book = {
-            "title": book_title,
-            "author": author_name,
-            "year": year_published,
-            "genre": book_genre,
-            "read": is_book_read,
-        }
-        self.book_list.append(new_book)
-        self.save_to_file()
+        self.add_book(book_title, author_name, year_published, book_genre, is_book_read)
         print("Book added successfully!\n")
 
     def delete_book(self):
         """Remove a book from the collection using its title."""
         book_title = input("Enter the title of the book to remove:")
 
-        for book in self.book_list:
-            if book["title"].lower() == book_title.lower():
-                self.book_list.remove(book)
-                self.save_to_file()
-                print("Book removed successfully!\n")
-                return
+        if self.remove_book(book_title) is not None:
+            print("Book removed successfully!\n")
+        else:
             print("Book not found in the collection.\n")
 
     def find_book(self):
             """Search for a book in the collection using its title or author name."""
             search_type = input("Search by:\n1. Title\n2. Author\nEnter your Choice:")
-            search_text = input("Enter search term: ").lower()
-            found_books = [
-                book
-                for book in self.book_list
-                if search_text in book["title"].lower()
-                or search_text in book["author"].lower()
-            ]
+            search_text = input("Enter search term: ")
+            search_fields = {"1": ("title",), "2": ("author",)}.get(search_type.strip(), ("title", "author"))
+            found_books = self.search_books(search_text, search_fields)
             if found_books:
                 print("Matching Books:")
-                for index, book in enumerate(found_books, 1):
-                    reading_status = "Read" if book ["read"] else "Unread"
-                    print(
-                        f"{index}. {book['title']} by {book['author']} ({book['year']}) - {book['genre']} - {reading_status}"
-                    )
+                sys.stdout.write("".join(format_book(index, book) for index, book in enumerate(found_books, 1)))
             else:
                 print("No books found matching the search term.\n")
     def update_book(self):
         """Modify the details of an existing book in the collection."""
         book_title = input("Enter the title of the book you want to edit: ")
-        for book in self.book_list:
-            if book["title"].lower() == book_title.lower():
-                print("Leave blank to keep existing value.")
-                book["title"] = input(f"New title ({book['title']}): ") or book["title"]
-                book["author"] = (
-                    input(f"New author ({book['author']}): ") or book["author"]
-                )
-                book["year"] = input(f"New year ({book['year']}): ") or book["year"]
-                book["genre"] = input(f"New genre ({book['genre']}): ") or book["genre"]
-                book["read"] = (
-                    input("Have you read this book? (yes/no): ").strip().lower()
-                    == "yes"
-                )
-                self.save_to_file()
-                print("Book updated successfully!\n")
-                return
-        print("Book not found!\n")
-
-    def show_all_books(self):
-        """Display all books in the collection with their details."""
-        if not self.book_list:
+        book = self.get_book_by_title(book_title)
+        if book is None:
+            print("Book not found!\n")
+            return
+        print("Leave blank to keep existing value.")
+        changes = {}
+        changes["title"] = input(f"New title ({book['title']}): ") or book["title"]
+        changes["author"] = (
+            input(f"New author ({book['author']}): ") or book["author"]
+        )
+        changes["year"] = input(f"New year ({book['year']}): ") or book["year"]
+        changes["genre"] = input(f"New genre ({book['genre']}): ") or book["genre"]
+        changes["read"] = (
+            input("Have you read this book? (yes/no): ").strip().lower()
+            == "yes"
+        )
+        self.edit_book(book, **changes)
+        print("Book updated successfully!\n")
+
+    def show_all_books(self, page_size=DEFAULT_PAGE_SIZE):
+        """Display the books in the collection a page at a time, optionally sorted and filtered."""
+        if not self.count():
             print("Your collection is empty.\n")
             return
 
+        sort_by = input("Sort by (title/author/year, blank for the order added): ").strip().lower() or None
+        if sort_by is not None and sort_by not in self.sort_orders.orders:
+            print("Unknown sort order, showing books in the order added.")
+            sort_by = None
+        filters = {}
+        show_only = input("Show only (read, unread, genre:NAME, author:NAME, blank for all): ").strip()
+        if show_only.lower() in ("read", "unread"):
+            filters["read"] = show_only.lower() == "read"
+        elif ":" in show_only:
+            field, value = show_only.split(":", 1)
+            if field.strip().lower() in ("genre", "author"):
+                filters[field.strip().lower()] = value.strip()
+
         print("Your Book Collection:")
-        for index, book in enumerate(self.book_list, 1):
-            reading_status = "Read" if book["read"] else "Unread"
-            print(
-                f"{index}. {book['title']} by {book['author']} ({book['year']}) - {book['genre']} - {reading_status}"
-            )
+        books = self.iter_books(sort_by, **filters)
+        index = 0
+        while True:
+            page = list(islice(books, page_size))
+            if not page:
+                if not index:
+                    print("No books match.")
+                break
+            # One write per page instead of one print per book
+            sys.stdout.write("".join(format_book(index + offset, book) for offset, book in enumerate(page, 1)))
+            sys.stdout.flush()
+            index += len(page)
+            if len(page) < page_size or input("Press Enter for more, or q to stop: ").strip().lower() == "q":
+                break
         print()
 
     def show_reading_progress(self):
-        """Calculate and display statistics about your reading progress."""
-        total_books = len(self.book_list)
-        completed_books = sum(1 for book in self.book_list if book["read"])
-        completion_rate = (
-            (completed_books / total_books * 100) if total_books > 0 else 0
+        """Display statistics about your reading progress from the running totals."""
+        stats = self.get_reading_stats()
+        print(f"Total books in collection: {stats.total}")
+        print(f"Reading progress: {stats.completion_rate():.2f}%")
+        if not stats.total:
+            print()
+            return
+        print(f"Books read: {stats.read}, still to read: {stats.unread}")
+
+        print("\nBy genre:")
+        for genre, books, read in stats.breakdown("genre", limit=10):
+            print(f"  {genre}: {read}/{books} read ({read / books * 100:.0f}%)")
+        print("Most collected authors:")
+        for author, books, read in stats.breakdown("author", limit=5):
+            print(f"  {author}: {read}/{books} read")
+        backlog = stats.backlog_by_decade()
+        if backlog:
+            print("Reading backlog by decade:")
+            for decade, unread in backlog:
+                label = f"{decade}s" if isinstance(decade, int) else decade
+                print(f"  {label}: {unread} unread")
+        print()
+
+    def import_from_file(self):
+        """Import books from a CSV, JSONL or Goodreads export file named by the user."""
+        path = input("Enter the file to import (CSV, JSONL or Goodreads export): ").strip()
+        try:
+            counts = self.import_file(path)
+        except (OSError, ValueError) as error:
+            print(f"Could not import {path}: {error}\n")
+            return
+        print(
+            f"Imported {counts['added']} books, skipped {counts['duplicates']} duplicates"
+            f" and {counts['invalid']} invalid rows.\n"
         )
-        print(f"Total books in collection: {total_books}")
-        print(f"Reading progress: {completion_rate:.2f}%\n")
+
+    def export_to_file(self):
+        """Export every book to a CSV or JSONL file named by the user."""
+        path = input("Enter the file to export to (.csv or .jsonl): ").strip()
+        try:
+            count = self.export_file(path)
+        except OSError as error:
+            print(f"Could not export to {path}: {error}\n")
+            return
+        print(f"Exported {count} books to {path}.\n")
 
     def start_application(self):
         """Run the main application loop with a user-friendly menu interface."""
@@ -130,8 +437,10 @@ class BookCollection:
             print("4. Update book details")
             print("5. View all books")
             print("6. View reading progress")
-            print("7. Exit")
-            user_choice = input("Please choose an option (1-7): ")
+            print("7. Import books from a file")
+            print("8. Export books to a file")
+            print("9. Exit")
+            user_choice = input("Please choose an option (1-9): ")
 
             if user_choice == "1":
                 self.create_new_book()
@@ -146,7 +455,11 @@ class BookCollection:
             elif user_choice == "6":
                 self.show_reading_progress()
             elif user_choice == "7":
-                self.save_to_file()
+                self.import_from_file()
+            elif user_choice == "8":
+                self.export_to_file()
+            elif user_choice == "9":
+                self.storage.close()
                 print("Thank you for using Book Collection Manager. Goodbye!")
                 break
             else:
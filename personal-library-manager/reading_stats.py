@@ -0,0 +1,89 @@
+from heapq import nlargest
+
+STAT_GROUPS = ("genre", "author", "decade")
+UNKNOWN_DECADE = "Unknown"
+
+
+def decade_of(book):
+    """The decade a book was published in (1965 -> 1960, -505 -> -510), or UNKNOWN_DECADE.
+    Text years count when they are a whole number, as SQLite stores them."""
+    year = book["year"]
+    if isinstance(year, str):
+        year = year.strip()
+        digits = year[1:] if year[:1] in ("+", "-") else year
+        if not (digits.isascii() and digits.isdigit()):
+            return UNKNOWN_DECADE
+        year = int(year)
+    if not isinstance(year, int):
+        return UNKNOWN_DECADE
+    return year // 10 * 10
+
+
+class ReadingStats:
+    """Running totals of the collection's reading progress.
+
+    Besides the overall total and read count, counts[group][value] holds
+    [books, read books] for every genre, author and decade. add and remove
+    change a fixed number of counters, so the collection updates them on
+    every change instead of rescanning its books."""
+
+    def __init__(self):
+        self.total = 0
+        self.read = 0
+        self.counts = {group: {} for group in STAT_GROUPS}
+
+    def _keys(self, book):
+        return book["genre"], book["author"], decade_of(book)
+
+    def add(self, book):
+        """Count a book."""
+        read = 1 if book["read"] else 0
+        self.total += 1
+        self.read += read
+        for group, key in zip(STAT_GROUPS, self._keys(book)):
+            counter = self.counts[group].get(key)
+            if counter is None:
+                self.counts[group][key] = [1, read]
+            else:
+                counter[0] += 1
+                counter[1] += read
+
+    def remove(self, book):
+        """Stop counting a book; it must have the same field values it was added with."""
+        read = 1 if book["read"] else 0
+        self.total -= 1
+        self.read -= read
+        for group, key in zip(STAT_GROUPS, self._keys(book)):
+            counter = self.counts[group][key]
+            counter[0] -= 1
+            counter[1] -= read
+            if not counter[0]:
+                del self.counts[group][key]
+
+    @property
+    def unread(self):
+        return self.total - self.read
+
+    def completion_rate(self):
+        """Percentage of the collection that has been read."""
+        return self.read / self.total * 100 if self.total else 0
+
+    def breakdown(self, group, limit=None):
+        """Return [(value, books, read books)] for a group, largest first (at most `limit`)."""
+        items = ((key, books, read) for key, (books, read) in self.counts[group].items())
+        if limit is not None:
+            return nlargest(limit, items, key=lambda item: item[1])
+        return sorted(items, key=lambda item: -item[1])
+
+    def backlog_by_decade(self):
+        """Return [(decade, unread books)] in publication order, skipping fully read decades."""
+        decades = self.counts["decade"]
+        known = sorted(decade for decade in decades if decade != UNKNOWN_DECADE)
+        if UNKNOWN_DECADE in decades:
+            known.append(UNKNOWN_DECADE)
+        backlog = []
+        for decade in known:
+            books, read = decades[decade]
+            if books > read:
+                backlog.append((decade, books - read))
+        return backlog
@@ -0,0 +1,220 @@
+import re
+from contextlib import contextmanager
+from bisect import bisect_left, insort
+from collections import Counter
+from heapq import nsmallest
+from itertools import chain
+
+SEARCH_FIELDS = ("title", "author", "genre")
+# How much a match in each field counts towards a book's rank
+FIELD_WEIGHTS = {"title": 3.0, "author": 2.0, "genre": 1.0}
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.7
+FUZZY_MATCH = 0.5
+# A type-ahead prefix like "a" matches a large part of the vocabulary;
+# only this many completions are looked at
+MAX_PREFIX_EXPANSIONS = 64
+MIN_FUZZY_SIMILARITY = 0.3
+MAX_FUZZY_CANDIDATES = 16
+
+TOKEN_PATTERN = re.compile(r"\w+")
+FIELD_QUERY_PATTERN = re.compile(r"(\w+):(.*)")
+
+
+def tokenize(text):
+    """Split text into casefolded word tokens."""
+    return TOKEN_PATTERN.findall(str(text).casefold())
+
+
+def trigrams(token):
+    """The overlapping three-letter pieces of a token, padded so short tokens have some."""
+    padded = f"  {token} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """Inverted index over book titles, authors and genres.
+
+    postings[field][token] holds the ids of the books whose field contains
+    the token. A sorted vocabulary answers prefix (type-ahead) queries with
+    a binary search, and a trigram -> tokens map finds misspelled words.
+    All three are updated as books are added, changed and removed."""
+
+    def __init__(self):
+        self.postings = {field: {} for field in SEARCH_FIELDS}
+        self.token_counts = {}  # token -> number of (field, book) postings using it
+        self.vocabulary = []  # sorted tokens, for prefix search
+        self.trigram_tokens = {}  # trigram -> set of tokens
+        self.trigram_counts = {}  # token -> number of distinct trigrams it has
+        self._new_tokens = None  # During bulk_add: tokens to merge into the vocabulary at the end
+
+    def add(self, book):
+        """Index a book's searchable fields."""
+        book_id = book["id"]
+        token_counts = self.token_counts
+        for field in SEARCH_FIELDS:
+            postings = self.postings[field]
+            for token in set(tokenize(book[field])):
+                book_ids = postings.get(token)
+                if book_ids is None:
+                    postings[token] = {book_id}
+                else:
+                    book_ids.add(book_id)
+                # Counting an already known token is the common case; keep it inline
+                count = token_counts.get(token)
+                if count is None:
+                    self._use_token(token)
+                else:
+                    token_counts[token] = count + 1
+
+    @contextmanager
+    def bulk_add(self):
+        """Within this block, new tokens are sorted into the vocabulary once at the end
+        instead of one insort each. Prefix search misses them until then."""
+        if self._new_tokens is not None:
+            yield  # Nested: the outer block sorts
+            return
+        self._new_tokens = []
+        try:
+            yield
+        finally:
+            new_tokens, self._new_tokens = self._new_tokens, None
+            if new_tokens:
+                self.vocabulary.extend(new_tokens)
+                self.vocabulary.sort()
+
+    def add_many(self, books):
+        """Index many books at once."""
+        with self.bulk_add():
+            for book in books:
+                self.add(book)
+
+    def remove(self, book):
+        """Remove a book; it must be indexed with the same field values it has now."""
+        for field in SEARCH_FIELDS:
+            postings = self.postings[field]
+            for token in set(tokenize(book[field])):
+                book_ids = postings[token]
+                book_ids.discard(book["id"])
+                if not book_ids:
+                    del postings[token]
+                self._release_token(token)
+
+    def _use_token(self, token):
+        count = self.token_counts.get(token, 0)
+        self.token_counts[token] = count + 1
+        if not count:
+            if self._new_tokens is None:
+                insort(self.vocabulary, token)
+            else:
+                self._new_tokens.append(token)
+            token_trigrams = trigrams(token)
+            self.trigram_counts[token] = len(token_trigrams)
+            for trigram in token_trigrams:
+                self.trigram_tokens.setdefault(trigram, set()).add(token)
+
+    def _release_token(self, token):
+        count = self.token_counts[token] - 1
+        if count:
+            self.token_counts[token] = count
+            return
+        del self.token_counts[token]
+        del self.vocabulary[bisect_left(self.vocabulary, token)]
+        del self.trigram_counts[token]
+        for trigram in trigrams(token):
+            tokens = self.trigram_tokens[trigram]
+            tokens.discard(token)
+            if not tokens:
+                del self.trigram_tokens[trigram]
+
+    def completions(self, prefix):
+        """Vocabulary tokens starting with `prefix`, in sorted order (at most MAX_PREFIX_EXPANSIONS)."""
+        start = bisect_left(self.vocabulary, prefix)
+        matches = []
+        for token in self.vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not token.startswith(prefix):
+                break
+            matches.append(token)
+        return matches
+
+    def similar_tokens(self, token):
+        """Vocabulary tokens that share enough trigrams with `token`, as (token, similarity)."""
+        query_trigrams = trigrams(token)
+        # Counter counts a chained iterable in C, which matters for common trigrams
+        shared = Counter(chain.from_iterable(self.trigram_tokens.get(trigram, ()) for trigram in query_trigrams))
+        trigram_counts = self.trigram_counts
+        # Jaccard similarity needs at least this many shared trigrams to reach the minimum
+        minimum_shared = MIN_FUZZY_SIMILARITY * len(query_trigrams) / (1 + MIN_FUZZY_SIMILARITY)
+        similar = []
+        for candidate, count in shared.items():
+            if count < minimum_shared:
+                continue
+            similarity = count / (len(query_trigrams) + trigram_counts[candidate] - count)
+            if similarity >= MIN_FUZZY_SIMILARITY:
+                similar.append((candidate, similarity))
+        similar.sort(key=lambda item: -item[1])
+        return similar[:MAX_FUZZY_CANDIDATES]
+
+    def _term_scores(self, term, fields, prefix, fuzzy, candidates=None):
+        """Map book id -> best score for one query term within the given fields.
+        With `candidates`, only those books are scored (the earlier terms' matches)."""
+        expansions = [(term, EXACT_MATCH)]
+        if prefix:
+            expansions += [(token, PREFIX_MATCH) for token in self.completions(term) if token != term]
+        scores = {}
+        for token, quality in expansions:
+            self._add_scores(scores, token, quality, fields, candidates)
+        if not scores and fuzzy:
+            for token, similarity in self.similar_tokens(term):
+                self._add_scores(scores, token, FUZZY_MATCH * similarity, fields, candidates)
+        return scores
+
+    def _add_scores(self, scores, token, quality, fields, candidates):
+        for field in fields:
+            book_ids = self.postings[field].get(token)
+            if not book_ids:
+                continue
+            if candidates is not None and len(candidates) < len(book_ids):
+                # Probe the few candidates instead of walking a long posting list
+                book_ids = [book_id for book_id in candidates if book_id in book_ids]
+            score = FIELD_WEIGHTS[field] * quality
+            for book_id in book_ids:
+                if scores.get(book_id, 0.0) < score:
+                    scores[book_id] = score
+
+    def _posting_size(self, term, fields):
+        return sum(len(self.postings[field].get(term, ())) for field in fields)
+
+    def search(self, query, fields=SEARCH_FIELDS, limit=20, fuzzy=True):
+        """Return [(book id, score)] for books matching every query term, best first.
+
+        Terms written as field:word only match that field. The last term is
+        also matched as a prefix, so results update while the user types,
+        and terms with no exact or prefix match fall back to fuzzy matching."""
+        terms = []
+        for word in query.split():
+            scoped = FIELD_QUERY_PATTERN.fullmatch(word)
+            if scoped and scoped.group(1).casefold() in self.postings:
+                terms.extend((token, (scoped.group(1).casefold(),)) for token in tokenize(scoped.group(2)))
+            else:
+                terms.extend((token, tuple(fields)) for token in tokenize(word))
+        if not terms:
+            return []
+
+        # Rarest terms first, so later terms only need to check their matches
+        last = len(terms) - 1
+        order = sorted(range(len(terms)), key=lambda position: self._posting_size(*terms[position]))
+        totals = None
+        for position in order:
+            term, term_fields = terms[position]
+            scores = self._term_scores(term, term_fields, position == last, fuzzy, totals)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {book_id: score + scores[book_id] for book_id, score in totals.items() if book_id in scores}
+            if not totals:
+                return []
+        def rank(item):
+            return -item[1], item[0]
+
+        return nsmallest(limit, totals.items(), key=rank) if limit else sorted(totals.items(), key=rank)
@@ -0,0 +1,203 @@
+import io
+import json
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from itertools import islice
+
+from journal_storage import _fsync_directory
+from listing import SORT_KEYS, SORT_ORDERS, matches
+from reading_stats import ReadingStats
+from search_index import SEARCH_FIELDS, tokenize
+from storage import StorageBackend
+
+SNAPSHOT_SUFFIX = ".booksnap"
+MAGIC = b"BOOKSNAP"
+VERSION = 1
+SECTIONS = ("records", "heap") + SORT_ORDERS + ("stats",)
+# magic, version, book count, then (offset, length) of every section
+HEADER = struct.Struct("<8sII" + "QQ" * len(SECTIONS))
+# id, (offset, length) into the heap of title, author, genre and a non-numeric year,
+# the numeric year, flags
+RECORD = struct.Struct("<q8IqB")
+READ_FLAG = 1
+NUMERIC_YEAR_FLAG = 2
+ALIGNMENT = 8
+
+
+class SnapshotStorage(StorageBackend):
+    """A read-only collection file that opens in constant time.
+
+    The file is a header, a table of fixed-width records, a heap of UTF-8
+    strings (each distinct author, genre and title stored once), one array
+    of record numbers per sort order, and the reading statistics. It is
+    memory-mapped on open, so nothing is read until it is used: a record is
+    decoded only when a listing or lookup reaches it, and the sort orders
+    and title lookups work directly on the mapped arrays."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.orders = {}
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, self.book_count, *sections = HEADER.unpack_from(self.map)
+        except (ValueError, struct.error):  # An empty file, or one too short for the header
+            self.file.close()
+            raise ValueError(f"{path} is not a version {VERSION} book snapshot") from None
+        self.view = memoryview(self.map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} book snapshot")
+        self.sections = {name: (sections[2 * index], sections[2 * index + 1]) for index, name in enumerate(SECTIONS)}
+        self.records_offset = self.sections["records"][0]
+        self.heap_offset = self.sections["heap"][0]
+        for name in SORT_ORDERS:
+            offset, length = self.sections[name]
+            self.orders[name] = self.view[offset:offset + length].cast("I")
+
+    def _string(self, offset, length):
+        start = self.heap_offset + offset
+        return str(self.view[start:start + length], "utf-8")
+
+    def _record(self, number):
+        """Decode record `number` into a book dict."""
+        (book_id, title_offset, title_length, author_offset, author_length, genre_offset, genre_length,
+         year_offset, year_length, numeric_year, flags) = RECORD.unpack_from(
+            self.map, self.records_offset + number * RECORD.size)
+        return {
+            "id": book_id,
+            "title": self._string(title_offset, title_length),
+            "author": self._string(author_offset, author_length),
+            "year": numeric_year if flags & NUMERIC_YEAR_FLAG else self._string(year_offset, year_length),
+            "genre": self._string(genre_offset, genre_length),
+            "read": bool(flags & READ_FLAG),
+        }
+
+    def _title(self, number):
+        _, title_offset, title_length = struct.unpack_from("<qII", self.map, self.records_offset + number * RECORD.size)
+        return self._string(title_offset, title_length)
+
+    def load_books(self):
+        return [self._record(number) for number in range(self.book_count)]
+
+    def count(self):
+        return self.book_count
+
+    def find_by_title(self, title):
+        order = self.orders["title"]
+        key = title.casefold()
+        # The title order sorts by (casefolded title, id), so equal titles are adjacent and oldest first
+        position = bisect_left(range(len(order)), key, key=lambda index: self._title(order[index]).casefold())
+        books = []
+        while position < len(order) and self._title(order[position]).casefold() == key:
+            books.append(self._record(order[position]))
+            position += 1
+        return books
+
+    def iter_books(self, sort_by=None, descending=False, offset=0, **filters):
+        numbers = range(self.book_count) if sort_by is None else self.orders[sort_by]
+        positions = range(len(numbers) - 1, -1, -1) if descending else range(len(numbers))
+        if not filters:
+            return (self._record(numbers[position]) for position in positions[offset:])
+        books = (self._record(numbers[position]) for position in positions)
+        return islice((book for book in books if matches(book, filters)), offset, None)
+
+    def find_books(self, query, fields=SEARCH_FIELDS, limit=None):
+        words = tokenize(query)
+        if not words:
+            return []
+        found = []
+        # Walk the title order so matches come out sorted and the scan can stop at `limit`
+        for number in self.orders["title"]:
+            book = self._record(number)
+            if all(any(word in str(book[field]).casefold() for field in fields) for word in words):
+                found.append(book)
+                if limit and len(found) == limit:
+                    break
+        return found
+
+    def reading_stats(self):
+        offset, length = self.sections["stats"]
+        saved = json.loads(bytes(self.view[offset:offset + length]))
+        stats = ReadingStats()
+        stats.total, stats.read = saved["total"], saved["read"]
+        for group, key, books, read in saved["counts"]:
+            stats.counts[group][key] = [books, read]
+        return stats
+
+    def add_book(self, book):
+        raise io.UnsupportedOperation(f"{self.path} is a read-only snapshot")
+
+    def update_book(self, book):
+        raise io.UnsupportedOperation(f"{self.path} is a read-only snapshot")
+
+    def delete_book(self, book_id):
+        raise io.UnsupportedOperation(f"{self.path} is a read-only snapshot")
+
+    def close(self):
+        if self.map.closed:
+            return
+        for order in self.orders.values():
+            order.release()
+        self.view.release()
+        self.map.close()
+        self.file.close()
+
+
+def write_snapshot(books, path):
+    """Write books (dicts or Book objects with ids) to a snapshot file and return how many there were.
+    Records are stored by id, the order books were added, whatever order they come in.
+    The file is written next to `path` and renamed over it, so readers never see half of it."""
+    books = sorted(books, key=lambda book: book["id"])
+    heap = bytearray()
+    heap_strings = {}  # Each distinct string is stored once
+
+    def store(text):
+        location = heap_strings.get(text)
+        if location is None:
+            encoded = str(text).encode("utf-8")
+            location = heap_strings[text] = (len(heap), len(encoded))
+            heap.extend(encoded)
+        return location
+
+    records = bytearray(RECORD.size * len(books))
+    stats = ReadingStats()
+    for number, book in enumerate(books):
+        year = "" if book["year"] is None else book["year"]
+        numeric_year = isinstance(year, int) and not isinstance(year, bool)
+        flags = (READ_FLAG if book["read"] else 0) | (NUMERIC_YEAR_FLAG if numeric_year else 0)
+        RECORD.pack_into(records, number * RECORD.size, book["id"], *store(book["title"]), *store(book["author"]),
+                         *store(book["genre"]), *((0, 0) if numeric_year else store(year)),
+                         year if numeric_year else 0, flags)
+        stats.add(book)
+
+    sections = {"records": records, "heap": heap}
+    for name in SORT_ORDERS:
+        sort_key = SORT_KEYS[name]
+        order = array("I", sorted(range(len(books)), key=lambda number: sort_key(books[number])))
+        sections[name] = order.tobytes()
+    rows = [[group, key, books_counted, read] for group, counts in stats.counts.items()
+            for key, (books_counted, read) in counts.items()]
+    sections["stats"] = json.dumps({"total": stats.total, "read": stats.read, "counts": rows}).encode("utf-8")
+
+    layout = []
+    offset = HEADER.size
+    for name in SECTIONS:
+        offset += -offset % ALIGNMENT  # Keep the arrays aligned for the memoryview casts
+        layout.append((offset, len(sections[name])))
+        offset += len(sections[name])
+
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(books), *(value for location in layout for value in location)))
+        for name, (offset, _) in zip(SECTIONS, layout):
+            file.write(b"\0" * (offset - file.tell()))
+            file.write(sections[name])
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+    _fsync_directory(path)
+    return len(books)
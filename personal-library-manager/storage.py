@@ -0,0 +1,449 @@
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+
+from listing import SORT_KEYS, matches
+from reading_stats import UNKNOWN_DECADE, ReadingStats
+from search_index import SEARCH_FIELDS, tokenize
+
+BOOK_FIELDS = ("title", "author", "year", "genre", "read")
+DEFAULT_DATABASE = "books.db"
+LEGACY_JSON_FILE = "books_data.json"
+
+
+class StorageBackend:
+    """Interface for the places a BookCollection can keep its books.
+
+    Every book is a dict with the BOOK_FIELDS plus an integer "id" that the
+    backend assigns in add_book and that identifies the book afterwards.
+    Books passed in may also be Book objects, which index the same way."""
+
+    def load_books(self):
+        """Return every stored book as a list of dicts."""
+        raise NotImplementedError
+
+    def add_book(self, book):
+        """Store a new book and return its id."""
+        raise NotImplementedError
+
+    def add_books(self, books):
+        """Store several new books in one transaction and return their ids."""
+        with self.transaction():
+            return [self.add_book(book) for book in books]
+
+    def update_book(self, book):
+        """Overwrite the stored fields of an existing book (matched by id)."""
+        raise NotImplementedError
+
+    def delete_book(self, book_id):
+        """Remove a book by id."""
+        raise NotImplementedError
+
+    @contextmanager
+    def transaction(self):
+        """Group several changes so they are written together, and none of them are kept if the
+        block raises. Nested transactions join the outermost one."""
+        yield
+
+    @contextmanager
+    def deferred_indexes(self):
+        """Inside a transaction: stop maintaining secondary indexes until the block ends,
+        then build them once. For large imports; lookups may be slow meanwhile."""
+        yield
+
+    def count(self):
+        """Return the number of stored books."""
+        return len(self.load_books())
+
+    # Queries a BookCollection answers from storage until it loads its own indexes.
+    # These defaults work on load_books; a backend with indexes of its own can do better.
+
+    def find_by_title(self, title):
+        """Return the stored books with this title (ignoring case), oldest first."""
+        title = title.casefold()
+        return [book for book in self.load_books() if book["title"].casefold() == title]
+
+    def iter_books(self, sort_by=None, descending=False, offset=0, **filters):
+        """Yield stored books sorted by "title", "author" or "year" (None: by id), skipping
+        the first `offset` of those that match the filters (read, genre, author)."""
+        books = self.load_books()
+        if sort_by is not None:
+            books.sort(key=SORT_KEYS[sort_by])
+        if descending:
+            books.reverse()
+        if filters:
+            books = [book for book in books if matches(book, filters)]
+        return iter(books[offset:])
+
+    def find_books(self, query, fields=SEARCH_FIELDS, limit=None):
+        """Return stored books where every query word appears in one of the fields, by title.
+        A plain substring match: no ranking, prefixes or misspellings like SearchIndex."""
+        words = tokenize(query)
+        found = [
+            book for book in self.load_books()
+            if all(any(word in str(book[field]).casefold() for field in fields) for word in words)
+        ]
+        found.sort(key=SORT_KEYS["title"])
+        return found[:limit] if limit else found
+
+    def reading_stats(self):
+        """Return ReadingStats for the stored books."""
+        stats = ReadingStats()
+        for book in self.load_books():
+            stats.add(book)
+        return stats
+
+    def flush(self):
+        """Make sure every change so far is on disk."""
+
+    def close(self):
+        """Release files and connections."""
+        self.flush()
+
+
+class JsonFileStorage(StorageBackend):
+    """The original format: the whole collection rewritten to one JSON file on every change."""
+
+    def __init__(self, path=LEGACY_JSON_FILE):
+        self.path = path
+        self.books = []
+        self._batch_depth = 0
+        try:
+            with open(self.path, "r") as file:
+                self.books = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.books = []
+        # Files written before books had ids get them on load
+        self.next_id = max((book.get("id", 0) for book in self.books), default=0) + 1
+        for book in self.books:
+            if "id" not in book:
+                book["id"] = self.next_id
+                self.next_id += 1
+
+    def load_books(self):
+        return [dict(book) for book in self.books]
+
+    def add_book(self, book):
+        stored = {field: book[field] for field in BOOK_FIELDS}
+        stored["id"] = self.next_id
+        self.next_id += 1
+        self.books.append(stored)
+        self._save()
+        return stored["id"]
+
+    def update_book(self, book):
+        for stored in self.books:
+            if stored["id"] == book["id"]:
+                stored.update({field: book[field] for field in BOOK_FIELDS})
+                break
+        self._save()
+
+    def delete_book(self, book_id):
+        self.books = [book for book in self.books if book["id"] != book_id]
+        self._save()
+
+    @contextmanager
+    def transaction(self):
+        """Write the file once at the end; if the block raises, restore the books as they were."""
+        if self._batch_depth:
+            yield
+            return
+        saved = [dict(book) for book in self.books], self.next_id  # update_book changes books in place
+        self._batch_depth = 1
+        try:
+            yield
+        except BaseException:
+            self.books, self.next_id = saved  # Nothing was written during the batch
+            raise
+        finally:
+            self._batch_depth = 0
+        self._save()
+
+    def count(self):
+        return len(self.books)
+
+    def _save(self):
+        if self._batch_depth:
+            return
+        with open(self.path, "w") as file:
+            json.dump(self.books, file, indent=4)
+
+
+# reading_stats rows of SQLiteStorage: group -> the key a book row is counted under
+STAT_KEYS = {
+    "total": "''",
+    "genre": "{row}.genre",
+    "author": "{row}.author",
+    # Floored like reading_stats.decade_of (-5 -> -10); SQLite's / and % round toward zero
+    "decade": f"CASE WHEN typeof({{row}}.year) = 'integer'"
+              f" THEN {{row}}.year - ({{row}}.year % 10 + 10) % 10 ELSE '{UNKNOWN_DECADE}' END",
+}
+# PRAGMA user_version of a database whose triggers and reading_stats follow STAT_KEYS
+STATS_VERSION = 1
+
+
+def _count_stats(row):
+    """Trigger statements counting the book in `row` (NEW) into reading_stats."""
+    return "".join(
+        f"INSERT INTO reading_stats VALUES ('{group}', {key.format(row=row)}, 1, {row}.read)"
+        f" ON CONFLICT (grp, key) DO UPDATE SET books = books + 1, read = read + excluded.read;"
+        for group, key in STAT_KEYS.items()
+    )
+
+
+def _uncount_stats(row):
+    """Trigger statements taking the book in `row` (OLD) out of reading_stats."""
+    return "".join(
+        f"UPDATE reading_stats SET books = books - 1, read = read - {row}.read"
+        f" WHERE grp = '{group}' AND key = {key.format(row=row)};"
+        f"DELETE FROM reading_stats WHERE grp = '{group}' AND key = {key.format(row=row)} AND books = 0;"
+        for group, key in STAT_KEYS.items()
+    )
+
+
+class SQLiteStorage(StorageBackend):
+    """Books as rows of an SQLite database in WAL mode, so each change writes only its own row.
+
+    Title, author and genre are also stored casefolded (title_key and so on),
+    since NOCASE and LIKE only ignore the case of ASCII letters; lookups,
+    filters, searches and sort orders use those columns, so they agree with
+    the casefolded in-memory indexes for titles like "Émile"."""
+
+    FOLDED_FIELDS = ("title", "author", "genre")
+    INDEXES = {
+        "books_title": "title_key",
+        "books_author": "author_key",
+        "books_year": "year",
+        "books_genre": "genre_key",
+        "books_read": "read",
+    }
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS books ("
+        " id INTEGER PRIMARY KEY,"
+        " title TEXT NOT NULL,"
+        " author TEXT NOT NULL,"
+        " year INTEGER,"  # INTEGER affinity: numeric years are stored as numbers
+        " genre TEXT NOT NULL,"
+        " read INTEGER NOT NULL,"
+        " title_key TEXT NOT NULL DEFAULT '',"
+        " author_key TEXT NOT NULL DEFAULT '',"
+        " genre_key TEXT NOT NULL DEFAULT '')",
+        # The counters of ReadingStats, kept up to date by the triggers below
+        "CREATE TABLE IF NOT EXISTS reading_stats ("
+        " grp TEXT NOT NULL,"
+        " key NOT NULL,"
+        " books INTEGER NOT NULL,"
+        " read INTEGER NOT NULL,"
+        " PRIMARY KEY (grp, key))",
+    )
+    DERIVED = tuple(f"CREATE INDEX IF NOT EXISTS {name} ON books ({columns})" for name, columns in INDEXES.items()) + (
+        f"CREATE TRIGGER IF NOT EXISTS books_count AFTER INSERT ON books BEGIN {_count_stats('NEW')} END",
+        f"CREATE TRIGGER IF NOT EXISTS books_uncount AFTER DELETE ON books BEGIN {_uncount_stats('OLD')} END",
+        "CREATE TRIGGER IF NOT EXISTS books_recount AFTER UPDATE ON books"
+        f" BEGIN {_uncount_stats('OLD')}{_count_stats('NEW')} END",
+    )
+    TRIGGERS = ("books_count", "books_uncount", "books_recount")
+    # Fixed statement texts, so sqlite3's statement cache prepares each only once
+    INSERT = ("INSERT INTO books (title, author, year, genre, read, title_key, author_key, genre_key)"
+              " VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+    UPDATE = ("UPDATE books SET title = ?, author = ?, year = ?, genre = ?, read = ?,"
+              " title_key = ?, author_key = ?, genre_key = ? WHERE id = ?")
+    DELETE = "DELETE FROM books WHERE id = ?"
+    SELECT_ALL = "SELECT id, title, author, year, genre, read FROM books ORDER BY id"
+    SELECT_BOOKS = "SELECT id, title, author, year, genre, read FROM books"
+    # The same orders as listing.SORT_KEYS
+    ORDER_BY = {
+        None: ("id",),
+        "title": ("title_key", "id"),
+        "author": ("author_key", "title_key", "id"),
+        "year": ("year", "title_key", "id"),  # SQLite sorts numbers before text
+    }
+    # Genre and author values are casefolded before they are bound
+    FILTERS = {"read": "read = ?", "genre": "genre_key = ?", "author": "author_key = ?"}
+
+    def __init__(self, path=DEFAULT_DATABASE):
+        self.path = path
+        # Autocommit mode: a change outside transaction() commits on its own
+        self.connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode NORMAL only syncs at checkpoints and stays crash-safe
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self._in_transaction = False
+        with self.transaction():
+            for statement in self.SCHEMA:
+                self.connection.execute(statement)
+            self._add_folded_columns()
+            outdated = self.connection.execute("PRAGMA user_version").fetchone()[0] < STATS_VERSION
+            if outdated:
+                # Triggers are only created if missing, so older definitions have to go first
+                for name in self.TRIGGERS:
+                    self.connection.execute(f"DROP TRIGGER IF EXISTS {name}")
+            for statement in self.DERIVED:
+                self.connection.execute(statement)
+            if outdated:
+                # Also fills reading_stats for databases from before it existed
+                self._rebuild_stats()
+                self.connection.execute(f"PRAGMA user_version = {STATS_VERSION}")
+
+    def _add_folded_columns(self):
+        """Give databases from before the casefolded columns existed those columns, filled in,
+        and drop their old NOCASE indexes so DERIVED creates them on the new columns."""
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(books)")}
+        if "title_key" in columns:
+            return
+        for field in self.FOLDED_FIELDS:
+            self.connection.execute(f"ALTER TABLE books ADD COLUMN {field}_key TEXT NOT NULL DEFAULT ''")
+        for name in self.INDEXES:
+            self.connection.execute(f"DROP INDEX IF EXISTS {name}")
+        rows = self.connection.execute("SELECT title, author, genre, id FROM books").fetchall()
+        self.connection.executemany(
+            "UPDATE books SET title_key = ?, author_key = ?, genre_key = ? WHERE id = ?",
+            ((title.casefold(), author.casefold(), genre.casefold(), book_id) for title, author, genre, book_id in rows),
+        )
+
+    def load_books(self):
+        return [self._record(row) for row in self.connection.execute(self.SELECT_ALL)]
+
+    @staticmethod
+    def _record(row):
+        return {"id": row[0], "title": row[1], "author": row[2], "year": row[3], "genre": row[4], "read": bool(row[5])}
+
+    def add_book(self, book):
+        cursor = self.connection.execute(self.INSERT, self._values(book))
+        return cursor.lastrowid
+
+    def add_books(self, books):
+        """Insert many books in one transaction and return their ids."""
+        with self.transaction():
+            return [self.connection.execute(self.INSERT, self._values(book)).lastrowid for book in books]
+
+    def update_book(self, book):
+        self.connection.execute(self.UPDATE, self._values(book) + (book["id"],))
+
+    def delete_book(self, book_id):
+        self.connection.execute(self.DELETE, (book_id,))
+
+    @contextmanager
+    def transaction(self):
+        if self._in_transaction:
+            yield  # Nested: the outer transaction commits
+            return
+        self._in_transaction = True
+        self.connection.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        else:
+            self.connection.execute("COMMIT")
+        finally:
+            self._in_transaction = False
+
+    @contextmanager
+    def deferred_indexes(self):
+        """Drop the secondary indexes and statistics triggers and rebuild them at the end of the block.
+        Building an index once sorts the rows; keeping it up during a large
+        import costs a B-tree insert per row and index. If the block fails,
+        rolling back the enclosing transaction brings the indexes back."""
+        for name in self.INDEXES:
+            self.connection.execute(f"DROP INDEX IF EXISTS {name}")
+        for name in self.TRIGGERS:
+            self.connection.execute(f"DROP TRIGGER IF EXISTS {name}")
+        yield
+        for statement in self.DERIVED:
+            self.connection.execute(statement)
+        self._rebuild_stats()
+
+    def _rebuild_stats(self):
+        """Recount reading_stats from the books table."""
+        self.connection.execute("DELETE FROM reading_stats")
+        for group, key in STAT_KEYS.items():
+            key = key.format(row="books")
+            self.connection.execute(
+                f"INSERT INTO reading_stats SELECT '{group}', {key}, COUNT(*), SUM(read) FROM books GROUP BY 2"
+            )
+
+    def count(self):
+        return self.connection.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+
+    def find_by_title(self, title):
+        rows = self.connection.execute(f"{self.SELECT_BOOKS} WHERE title_key = ? ORDER BY id", (title.casefold(),))
+        return [self._record(row) for row in rows]
+
+    def iter_books(self, sort_by=None, descending=False, offset=0, **filters):
+        direction = " DESC" if descending else ""
+        order = ", ".join(term + direction for term in self.ORDER_BY[sort_by])
+        where = " AND ".join(self.FILTERS[field] for field in filters)
+        parameters = [int(value) if field == "read" else value.casefold() for field, value in filters.items()]
+        statement = (f"{self.SELECT_BOOKS}{' WHERE ' + where if where else ''}"
+                     f" ORDER BY {order} LIMIT -1 OFFSET ?")
+        return map(self._record, self.connection.execute(statement, parameters + [offset]))
+
+    def find_books(self, query, fields=SEARCH_FIELDS, limit=None):
+        conditions = []
+        parameters = []
+        for word in tokenize(query):
+            pattern = "%" + word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            columns = [f"{field}_key" if field in self.FOLDED_FIELDS else field for field in fields]
+            conditions.append("(" + " OR ".join(f"{column} LIKE ? ESCAPE '\\'" for column in columns) + ")")
+            parameters += [pattern] * len(fields)
+        if not conditions:
+            return []
+        statement = f"{self.SELECT_BOOKS} WHERE {' AND '.join(conditions)} ORDER BY title_key, id"
+        if limit:
+            statement += f" LIMIT {int(limit)}"
+        return [self._record(row) for row in self.connection.execute(statement, parameters)]
+
+    def reading_stats(self):
+        """Read the counters the triggers keep, instead of loading every book."""
+        stats = ReadingStats()
+        for group, key, books, read in self.connection.execute("SELECT grp, key, books, read FROM reading_stats"):
+            if group == "total":
+                stats.total, stats.read = books, read
+            else:
+                stats.counts[group][key] = [books, read]
+        return stats
+
+    def close(self):
+        self.connection.close()
+
+    @staticmethod
+    def _values(book):
+        return (book["title"], book["author"], book["year"], book["genre"], int(bool(book["read"])),
+                book["title"].casefold(), book["author"].casefold(), book["genre"].casefold())
+
+
+def migrate_json_file(storage, json_path=LEGACY_JSON_FILE):
+    """Copy books from an old books_data.json into an empty storage, once.
+
+    The JSON file is renamed to <name>.migrated afterwards so the migration
+    never runs twice and the original data is kept."""
+    if not os.path.exists(json_path) or storage.count():
+        return 0
+    books = JsonFileStorage(json_path).load_books()
+    if not books:
+        return 0
+    with storage.transaction():
+        for book in books:
+            storage.add_book(book)
+    os.replace(json_path, json_path + ".migrated")
+    return len(books)
+
+
+def open_storage(path=DEFAULT_DATABASE):
+    """Open the backend that matches the file extension (.json, .journal, a read-only .booksnap
+    snapshot or an SQLite database)."""
+    if path.endswith(".json"):
+        return JsonFileStorage(path)
+    if path.endswith(".booksnap"):
+        from snapshot_storage import SnapshotStorage
+        return SnapshotStorage(path)
+    if path.endswith(".journal"):
+        from journal_storage import JournalStorage
+        storage = JournalStorage(path)
+    else:
+        storage = SQLiteStorage(path)
+    migrate_json_file(storage, os.path.join(os.path.dirname(path), LEGACY_JSON_FILE))
+    return storage